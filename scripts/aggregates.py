@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+
+from find_cliches import tokenize
+
+# Keys and additive columns of the mergeable summaries
+WEEKLY_KEYS = ["club", "manager", "week"]
+CLICHE_KEYS = ["club", "manager", "cliche"]
+TOTAL_COLUMNS = ["cliche_count", "word_count"]
+
+
+# Assign manager at publish date
+def assign_manager(row, tenure_df):
+    tenures = tenure_df[tenure_df["club"] == row["club"]]
+    for _, t in tenures.iterrows():
+        if t["start_date"] <= row["publish_date"] and (
+            pd.isna(t["end_date"]) or row["publish_date"] <= t["end_date"]
+        ):
+            return t["manager"]
+    return "Unknown"
+
+
+def transcript_rows(df, matches, tenure_df):
+    """Transcript-level rows as written to cliches_by_week.csv.
+
+    `df` holds the transcripts to process with a `transcript_id` column that
+    indexes into `matches`. Only these rows are tokenised, so the cost is
+    proportional to the transcripts passed in.
+    """
+    df = df.copy()
+    df["publish_date"] = pd.to_datetime(df["publish_date"])
+
+    # Count words and cliche matches per transcript
+    df["word_count"] = df["transcript_text"].apply(lambda t: len(tokenize(t)))
+    max_id = int(df["transcript_id"].max()) + 1 if len(df) else 0
+    counts = np.bincount(matches["transcript_id"], minlength=max_id)
+    df["cliche_count"] = counts[df["transcript_id"].to_numpy()].astype(float)
+
+    df["manager"] = df.apply(assign_manager, axis=1, tenure_df=tenure_df) if len(df) else []
+
+    # Add week column and normalize cliche rate
+    df["week"] = df["publish_date"].dt.to_period("W").dt.start_time
+    df["cliches_per_10000_words"] = (df["cliche_count"] / df["word_count"]) * 10000
+    return df
+
+
+def weekly_totals(rows):
+    """Cliché and word totals per club, manager and week."""
+    return rows.groupby(WEEKLY_KEYS)[TOTAL_COLUMNS].sum().reset_index()
+
+
+def cliche_totals(rows, matches, dim_cliches):
+    """Counts per club, manager and cliché for the transcripts in `rows`.
+
+    Counting is done on integer codes: each match gets a combined
+    (club/manager code, cliche_id) key and the keys are bincounted.
+    """
+    if rows.empty:
+        return pd.DataFrame(columns=CLICHE_KEYS + ["count"])
+    lookup = np.full(int(max(rows["transcript_id"].max(), matches["transcript_id"].max(initial=0))) + 1, -1)
+    group_codes, groups = pd.MultiIndex.from_frame(rows[["club", "manager"]]).factorize()
+    lookup[rows["transcript_id"].to_numpy()] = group_codes
+
+    codes = lookup[matches["transcript_id"]]
+    selected = codes >= 0
+    n_cliches = len(dim_cliches)
+    keys = codes[selected].astype(np.int64) * n_cliches + matches["cliche_id"][selected]
+    counts = np.bincount(keys, minlength=len(groups) * n_cliches)
+    nonzero = np.flatnonzero(counts)
+
+    return pd.DataFrame({
+        "club": groups.get_level_values(0)[nonzero // n_cliches],
+        "manager": groups.get_level_values(1)[nonzero // n_cliches],
+        "cliche": dim_cliches["cliche"].to_numpy()[nonzero % n_cliches],
+        "count": counts[nonzero],
+    })
+
+
+def combine(frames, keys, columns):
+    """Sum additive summaries that share the same keys."""
+    frames = [f for f in frames if f is not None and len(f)]
+    if not frames:
+        return pd.DataFrame(columns=keys + columns)
+    return pd.concat(frames).groupby(keys)[columns].sum().reset_index()
+
+
+def favourite_cliches(cliche_df):
+    return cliche_df.sort_values(["club", "manager", "count"], ascending=[True, True, False])
+
+
+def rate_summary(weekly, keys):
+    """Sum weekly totals over `keys` and add clichés per 10,000 words."""
+    grouped = weekly.groupby(keys)[TOTAL_COLUMNS].sum().reset_index()
+    grouped["cliches_per_10000_words"] = grouped["cliche_count"] / grouped["word_count"] * 10000
+    return grouped
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Defaults
+BASE_URL = os.getenv("API_FOOTBALL_BASE_URL", "https://v3.football.api-sports.io")
+CACHE_DIR = "data/cache/api_football"
+CACHE_TTL = 24 * 60 * 60  # Seconds; manager and team data changes rarely
+MAX_WORKERS = 4
+MAX_RETRIES = 5
+TIMEOUT = 30
+
+
+class QuotaExceeded(RuntimeError):
+    """Raised when the API reports the daily request quota is used up."""
+
+
+class ApiError(RuntimeError):
+    """Raised when the API returns errors in a 200 body (bad key, bad parameters, ...)."""
+
+
+class ApiClient:
+    """Pooled, cached and rate-limit aware client for API-Football.
+
+    Responses are cached on disk keyed by the full request URL, so reruns within
+    `cache_ttl` seconds make no network calls at all.
+    """
+
+    def __init__(self, api_key, base_url=BASE_URL, cache_dir=CACHE_DIR,
+                 cache_ttl=CACHE_TTL, max_workers=MAX_WORKERS, max_retries=MAX_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.network_calls = 0
+        self._lock = threading.Lock()
+
+        # One pooled session shared by every worker thread. Connection errors
+        # and 5xx responses are retried by urllib3; 429s are handled in `get`
+        # so that Retry-After and the quota headers can be honoured.
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=1,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET"],
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "x-rapidapi-host": "v3.football.api-sports.io",
+            "x-rapidapi-key": api_key or "",
+        })
+
+    # --- Cache ---
+    def _cache_path(self, url):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_cache(self, url):
+        path = self._cache_path(url)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url or time.time() - entry.get("fetched_at", 0) > self.cache_ttl:
+            return None
+        return entry["payload"]
+
+    def _write_cache(self, url, payload):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._cache_path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"url": url, "fetched_at": time.time(), "payload": payload}, f)
+        os.replace(tmp_path, path)
+
+    # --- Requests ---
+    def url(self, endpoint, **params):
+        query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+        return f"{self.base_url}/{endpoint.lstrip('/')}" + (f"?{query}" if query else "")
+
+    def get(self, endpoint, **params):
+        """Return the decoded JSON body for `endpoint`, from cache if fresh."""
+        url = self.url(endpoint, **params)
+        cached = self._read_cache(url)
+        if cached is not None:
+            return cached
+
+        for attempt in range(self.max_retries + 1):
+            with self._lock:
+                self.network_calls += 1
+            res = self.session.get(url, timeout=TIMEOUT)
+
+            if res.status_code == 429:
+                if res.headers.get("x-ratelimit-requests-remaining") == "0":
+                    raise QuotaExceeded(f"Daily API quota exhausted while requesting {url}")
+                wait = float(res.headers.get("Retry-After", 2 ** attempt))
+                print(f"  ⏳ Rate limited, retrying in {wait:.0f}s")
+                time.sleep(wait)
+                continue
+
+            res.raise_for_status()
+            payload = res.json()
+
+            # API-Football reports quota and per-minute limits in the body with a 200
+            errors = payload.get("errors") or {}
+            if isinstance(errors, dict):
+                if "requests" in errors:
+                    raise QuotaExceeded(errors["requests"])
+                if "rateLimit" in errors:
+                    wait = 2 ** attempt
+                    print(f"  ⏳ {errors['rateLimit']} Retrying in {wait}s")
+                    time.sleep(wait)
+                    continue
+            if errors:
+                # Never cached: the key is the URL alone, so a fixed API key would keep getting this
+                raise ApiError(f"{url}: {errors}")
+
+            self._write_cache(url, payload)
+            return payload
+
+        raise RuntimeError(f"Gave up on {url} after {self.max_retries + 1} attempts")
+
+    def get_many(self, endpoint, param_sets):
+        """Fetch `endpoint` for each dict in `param_sets` with bounded concurrency.
+
+        Results are returned in the same order as `param_sets`. A failed request
+        yields the raised exception in its slot, except for QuotaExceeded which
+        is propagated since every later call would fail the same way.
+        """
+        def fetch(params):
+            try:
+                return self.get(endpoint, **params)
+            except QuotaExceeded:
+                raise
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return list(pool.map(fetch, param_sets))
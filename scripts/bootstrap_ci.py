@@ -0,0 +1,123 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# Paths
+WEEKLY_PATH = "data/processed/cliches_by_week.csv"
+OUTPUT_DIR = "data/processed"
+
+# Parameters
+N_RESAMPLES = 10000
+CONFIDENCE = 0.95
+MIN_WORDS = 50000  # Same threshold as the league table
+SEED = 42
+BATCH_SIZE = 1000  # Resamples drawn per array operation (bounds memory)
+
+
+def bootstrap_rates(df, key, n_resamples=N_RESAMPLES, seed=SEED):
+    """Resample transcripts within each group and return per-resample rates.
+
+    Transcripts are laid out group by group in one flat array. A resample is a
+    row of random draws where each column picks a transcript from its own
+    group's slice, so a whole batch of resamples is one gather followed by an
+    `np.add.reduceat` over the group boundaries. Batches only bound memory;
+    nothing loops per resample or per group.
+
+    Returns the group labels and a (n_resamples, n_groups) array of clichés
+    per 10,000 words.
+    """
+    if df.empty:
+        return [], np.empty((n_resamples, 0))
+    rng = np.random.default_rng(seed)
+    df = df.sort_values(key, kind="stable")
+    codes = df.groupby(key, sort=False).ngroup().to_numpy()
+    labels = list(df.groupby(key, sort=False).groups.keys())
+
+    cliches = df["cliche_count"].to_numpy(dtype=float)
+    words = df["word_count"].to_numpy(dtype=float)
+    sizes = np.bincount(codes)
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    col_offset = offsets[codes]
+    col_size = sizes[codes]
+
+    cliche_totals = np.empty((n_resamples, len(sizes)))
+    word_totals = np.empty((n_resamples, len(sizes)))
+    for start in range(0, n_resamples, BATCH_SIZE):
+        stop = min(start + BATCH_SIZE, n_resamples)
+        draws = rng.random((stop - start, len(codes)))
+        idx = col_offset + (draws * col_size).astype(np.int64)
+        cliche_totals[start:stop] = np.add.reduceat(cliches[idx], offsets, axis=1)
+        word_totals[start:stop] = np.add.reduceat(words[idx], offsets, axis=1)
+
+    rates = np.divide(
+        cliche_totals * 10000, word_totals, out=np.zeros_like(word_totals), where=word_totals > 0
+    )
+    return labels, rates
+
+
+def rank_probabilities(rates):
+    """P(group finishes in each rank) from a (n_resamples, n_groups) rate array.
+
+    Rank 1 is the most clichéd. Returns an (n_groups, n_groups) array where row
+    i, column r is the probability that group i finishes in rank r + 1.
+    """
+    n_resamples, n_groups = rates.shape
+    ranks = (-rates).argsort(axis=1, kind="stable").argsort(axis=1, kind="stable")
+    flat = np.arange(n_groups)[None, :] * n_groups + ranks
+    counts = np.bincount(flat.ravel(), minlength=n_groups * n_groups)
+    return counts.reshape(n_groups, n_groups) / n_resamples
+
+
+def summarise(df, key, n_resamples=N_RESAMPLES, confidence=CONFIDENCE, min_words=MIN_WORDS, seed=SEED):
+    """Point estimates, percentile CIs and rank probabilities per group."""
+    totals = df.groupby(key).agg({"cliche_count": "sum", "word_count": "sum"}).reset_index()
+    totals = totals[totals["word_count"] >= min_words]
+    if totals.empty:
+        # Nothing clears MIN_WORDS yet (e.g. early in the season)
+        columns = ["cliche_count", "word_count", "ci_low", "ci_high", "expected_rank",
+                   "p_top", "p_bottom", "cliches_per_10000_words", "rank"]
+        return pd.DataFrame(columns=key + columns), pd.DataFrame(columns=key)
+    df = df.merge(totals[key], on=key)
+
+    labels, rates = bootstrap_rates(df, key, n_resamples=n_resamples, seed=seed)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(rates, [alpha, 1 - alpha], axis=0)
+    probs = rank_probabilities(rates)
+
+    index = pd.MultiIndex.from_tuples([l if isinstance(l, tuple) else (l,) for l in labels], names=key)
+    summary = pd.DataFrame({
+        "ci_low": low,
+        "ci_high": high,
+        "expected_rank": probs @ np.arange(1, len(labels) + 1),
+        "p_top": probs[:, 0],
+        "p_bottom": probs[:, -1],
+    }, index=index).reset_index()
+    summary = totals.merge(summary, on=key)
+    summary["cliches_per_10000_words"] = summary["cliche_count"] / summary["word_count"] * 10000
+    summary = summary.sort_values("cliches_per_10000_words", ascending=False).reset_index(drop=True)
+    summary["rank"] = summary.index + 1
+
+    rank_cols = [f"p_rank_{r}" for r in range(1, len(labels) + 1)]
+    rank_df = pd.DataFrame(probs, index=index, columns=rank_cols).reset_index()
+
+    return summary, rank_df
+
+
+def main():
+    df = pd.read_csv(WEEKLY_PATH)
+    df["manager"] = df["manager"].fillna("Unknown")
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    for name, key in [("club", ["club"]), ("manager", ["club", "manager"])]:
+        start = time.perf_counter()
+        summary, rank_df = summarise(df, key)
+        elapsed = time.perf_counter() - start
+
+        summary.to_csv(os.path.join(OUTPUT_DIR, f"cliches_by_{name}_ci.csv"), index=False)
+        rank_df.to_csv(os.path.join(OUTPUT_DIR, f"rank_probabilities_by_{name}.csv"), index=False)
+        print(f"✅ {N_RESAMPLES} resamples over {len(summary)} {name}s in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import re
+import pandas as pd
+
+# Paths
+TRANSCRIPT_PATH = "data/raw/transcripts.csv"  # Written by fetch_transcripts.py; never modified here
+CLEAN_PATH = "data/raw/transcripts_clean.csv"  # Input to dedup_transcripts.py
+
+# Parameters
+MIN_OVERLAP = 2  # Shorter repeats across a segment boundary are left alone; they may be real speech
+
+# Non-speech markers in auto-captions: [Music], [Applause], ♪, >> speaker changes
+MARKERS = re.compile(
+    r"\[[^\]]*\]|\((?:music|applause|laughter|inaudible|crosstalk)\)|♪+|>>+",
+    re.IGNORECASE,
+)
+APOSTROPHES = re.compile(r"[‘’‛′`´]")
+WORD_HYPHENS = re.compile(r"(?<=\w)[\u2010-\u2013\u2212](?=\w)")  # Hyphen look-alikes inside a word
+DASHES = re.compile(r"[\u2010-\u2015\u2212]|(?<!\w)-+(?!\w)")  # Any dash left over is punctuation
+WHITESPACE = re.compile(r"\s+")
+TOKENS = re.compile(r"\S+")
+
+
+def normalise(text):
+    """Strip non-speech markers and write apostrophes and hyphens as in data/cliches.yaml.
+
+    Returns (text, tokens_dropped), where a whitespace token of the input is
+    dropped if nothing of it survives. Every substitution keeps character
+    positions (removed text is blanked, not deleted), so each input token
+    can be checked against the output directly.
+    """
+    text = str(text)
+    blank = lambda m: " " * len(m.group())
+    out = MARKERS.sub(blank, text)
+    out = APOSTROPHES.sub("'", out)
+    out = WORD_HYPHENS.sub("-", out)
+    out = DASHES.sub(blank, out)
+    dropped = sum(1 for m in TOKENS.finditer(text) if out[m.start():m.end()].isspace())
+    return WHITESPACE.sub(" ", out).strip(), dropped
+
+
+def overlap(tail, head):
+    """Length of the longest suffix of `tail` that is also a prefix of `head`.
+
+    Prefix function (KMP) over `head + [separator] + tail`, so the cost is
+    linear in the two lengths.
+    """
+    seq = head + [None] + tail
+    pi = [0] * len(seq)
+    for i in range(1, len(seq)):
+        k = pi[i - 1]
+        while k and seq[i] != seq[k]:
+            k = pi[k - 1]
+        if seq[i] == seq[k]:
+            k += 1
+        pi[i] = k
+    return pi[-1]
+
+
+def clean_segments(segments):
+    """Join caption segments into one transcript without rolling duplicates.
+
+    Auto-captions repeat the end of one segment at the start of the next.
+    Each segment is compared only against as many trailing output tokens as
+    it has itself, so the whole transcript is cleaned in linear time.
+    Returns (text, tokens_removed): the markers and dashes dropped by
+    `normalise` plus the repeated tokens skipped at segment boundaries.
+    """
+    out, keys = [], []  # Tokens as written, and lowercased for comparison
+    removed = 0
+    for segment in segments:
+        text, dropped = normalise(segment)
+        tokens = text.split()
+        removed += dropped
+        if not tokens:
+            continue
+        head = [t.lower() for t in tokens]
+        k = overlap(keys[-len(head):], head)
+        if k < MIN_OVERLAP:
+            k = 0
+        out.extend(tokens[k:])
+        keys.extend(head[k:])
+        removed += k
+    return " ".join(out), removed
+
+
+def clean_text(text):
+    """Normalise an already joined transcript; segment overlaps can no longer be found."""
+    return normalise(text)
+
+
+def main():
+    # Clean every transcript, including those fetched before cleaning was part of fetch_transcripts.py.
+    # The raw file is left as fetched, so rerunning starts from the same text.
+    df = pd.read_csv(TRANSCRIPT_PATH)
+    cleaned = df["transcript_text"].map(clean_text)
+    df["transcript_text"] = cleaned.str[0]
+    removed = cleaned.str[1]
+    df["tokens_removed"] = df.get("tokens_removed", 0) + removed
+    df.to_csv(CLEAN_PATH, index=False)
+
+    print(f"✅ Removed {removed.sum()} tokens from {(removed > 0).sum()} of {len(df)} transcripts, saved to {CLEAN_PATH}")
+    if removed.any():
+        print(df.loc[removed > 0, ["video_url", "tokens_removed"]].sort_values("tokens_removed", ascending=False).head(10).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
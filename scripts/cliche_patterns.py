@@ -0,0 +1,146 @@
+import re
+from bisect import bisect_right
+
+# Template syntax for entries in data/cliches.yaml:
+#   (a|b c)   alternation between word sequences
+#   x? (a|b)? optional word or group
+#   {slot}    any single word, e.g. "as good as {who} want"
+# An entry is either a template string or {name: ..., pattern: ...}. Without
+# an explicit name the cliché is named after its canonical form (first
+# alternative, no optional parts).
+SPECIAL = re.compile(r"\s*(\(|\)|\||\?|\{\w+\}|[^\s(|)?{}]+)")
+TEMPLATE_CHARS = re.compile(r"[(|)?{}]")
+
+
+class TemplateError(ValueError):
+    """Raised when a cliché template cannot be parsed."""
+
+
+def _lex(template):
+    pos, parts = 0, []
+    template = template.strip()
+    while pos < len(template):
+        m = SPECIAL.match(template, pos)
+        if not m:
+            raise TemplateError(f"Cannot parse {template!r} at {pos}")
+        parts.append(m.group(1))
+        pos = m.end()
+    return parts
+
+
+def _parse(parts, tokenize, pos=0, depth=0):
+    """Parse a sequence into [(kind, value, optional)] until ')' or '|'."""
+    seq = []
+    while pos < len(parts) and parts[pos] not in (")", "|"):
+        part = parts[pos]
+        if part == "(":
+            options = []
+            while True:
+                option, pos = _parse(parts, tokenize, pos + 1, depth + 1)
+                options.append(option)
+                if pos >= len(parts):
+                    raise TemplateError("Unclosed '('")
+                if parts[pos] == ")":
+                    break
+            node = ("alt", options)
+        elif part == "?":
+            raise TemplateError("'?' must follow a word or group")
+        elif part.startswith("{"):
+            node = ("slot", part[1:-1])
+        else:
+            node = ("words", tokenize(part))
+        pos += 1
+        optional = pos < len(parts) and parts[pos] == "?"
+        if optional:
+            pos += 1
+        seq.append((*node, optional))
+    if depth == 0 and pos < len(parts):
+        raise TemplateError(f"Unexpected {parts[pos]!r}")
+    return seq, pos
+
+
+def _to_regex(seq):
+    out = []
+    for kind, value, optional in seq:
+        if kind == "words":
+            body = "".join(re.escape(t) + " " for t in value)
+        elif kind == "slot":
+            body = "[^ ]+ "
+        else:
+            body = "|".join(_to_regex(option) for option in value)
+        out.append(f"(?:{body})?" if optional else f"(?:{body})")
+    return "".join(out)
+
+
+def _canonical(seq, keep_slots=True):
+    words = []
+    for kind, value, optional in seq:
+        if optional:
+            continue
+        if kind == "words":
+            words.extend(value)
+        elif kind == "slot":
+            if keep_slots:
+                words.append(f"{{{value}}}")
+        else:
+            words.extend(_canonical(value[0], keep_slots))
+    return words
+
+
+class ClicheCatalogue:
+    """All clichés compiled into one regex over the space-joined token stream.
+
+    Each cliché is a named group inside a single lookahead alternation, so one
+    `finditer` pass over a transcript finds every token start with at least
+    one exact (or template) hit. An alternation only reports its first
+    matching group, so at those starts a second regex of one optional
+    lookahead per cliché picks up every cliché that matches there
+    ("he'll be disappointed with that" and "... that one").
+    """
+
+    def __init__(self, entries, tokenize):
+        self.names = []
+        self.fuzzy_forms = []  # Canonical token forms used by the fuzzy fallback
+        groups = []
+        for i, entry in enumerate(entries):
+            if isinstance(entry, dict):
+                name, template = entry.get("name"), entry["pattern"]
+            else:
+                name, template = None, entry
+            seq, _ = _parse(_lex(template), tokenize)
+            if not _canonical(seq):
+                raise TemplateError(f"Cliché template {template!r} has no required words")
+            if not name:
+                name = " ".join(_canonical(seq)) if TEMPLATE_CHARS.search(template) else template.strip()
+            self.names.append(name)
+            self.fuzzy_forms.append(" ".join(_canonical(seq, keep_slots=False)))
+            groups.append(f"(?P<c{i}>{_to_regex(seq)})")
+        self.regex = re.compile(r"(?<![^ ])(?=" + "|".join(groups) + ")")
+        self.all_at = re.compile("".join(f"(?:(?={g})|)" for g in groups))
+
+    def scan(self, tokens):
+        """Return (cliche_index, start_token, end_token) for every exact hit.
+
+        A hit inside a longer hit of the same cliché is dropped, so an
+        optional prefix ("(have to)? take our chances") counts once.
+        """
+        text = " ".join(tokens) + " "
+        starts, offset = [], 0
+        for token in tokens:
+            starts.append(offset)
+            offset += len(token) + 1
+
+        hits = []
+        furthest = {}  # cliche_index -> end of its latest kept hit
+        for m in self.regex.finditer(text):
+            at = self.all_at.match(text, m.start())
+            start = bisect_right(starts, m.start()) - 1
+            for i in range(len(self.names)):
+                if at.start(f"c{i}") < 0:
+                    continue
+                end = bisect_right(starts, at.end(f"c{i}") - 1)
+                if end <= furthest.get(i, -1):
+                    continue
+                furthest[i] = end
+                hits.append((i, start, end))
+        return hits
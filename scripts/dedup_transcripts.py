@@ -0,0 +1,141 @@
+import os
+import zlib
+import numpy as np
+import pandas as pd
+import nltk
+
+from find_cliches import tokenize
+
+# Paths
+INPUT_PATH = "data/raw/transcripts_clean.csv"  # Written by clean_captions.py
+OUTPUT_PATH = "data/raw/transcripts_canonical.csv"
+REPORT_PATH = "data/processed/duplicate_transcripts.csv"
+
+# Parameters
+SHINGLE_SIZE = 5  # Tokens per shingle
+NUM_PERM = 256  # MinHash signature length
+BANDS = 128  # LSH bands; rows per band = NUM_PERM // BANDS
+# Few rows per band so that short cuts contained in a full upload (low
+# Jaccard, high containment) still collide; candidates are verified exactly.
+CONTAINMENT_THRESHOLD = 0.8  # Share of the smaller transcript's shingles found in the larger
+SEED = 1
+EMPTY = np.iinfo(np.uint64).max  # Signature value for transcripts with no shingles
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Unique 32-bit hashes of the token `size`-grams in `text`."""
+    tokens = tokenize(text) if isinstance(text, str) else []
+    if len(tokens) < size:
+        return np.empty(0, dtype=np.uint64)
+    grams = (" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1))
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64))
+
+
+def minhash_signatures(shingle_sets, num_perm=NUM_PERM, seed=SEED):
+    """(n_docs, num_perm) MinHash signatures.
+
+    Each permutation is a multiply-shift hash ((a*x + b) mod 2^64) >> 32 with
+    odd `a`, which relies on uint64 wraparound instead of a modulo.
+    """
+    rng = np.random.default_rng(seed)
+    a = (rng.integers(0, EMPTY, num_perm, dtype=np.uint64, endpoint=True) | np.uint64(1))[:, None]
+    b = rng.integers(0, EMPTY, num_perm, dtype=np.uint64, endpoint=True)[:, None]
+    signatures = np.full((len(shingle_sets), num_perm), EMPTY, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for i, s in enumerate(shingle_sets):
+            if s.size:
+                signatures[i] = ((a * s[None, :] + b) >> np.uint64(32)).min(axis=1)
+    return signatures
+
+
+def candidate_pairs(signatures, groups, bands=BANDS):
+    """Pairs of documents sharing at least one LSH band bucket within the same group."""
+    rows = signatures.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        buckets = {}
+        chunk = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        for i, (group, key) in enumerate(zip(groups, chunk)):
+            if key[0] == EMPTY:  # No shingles
+                continue
+            buckets.setdefault((group, key.tobytes()), []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    pairs.add((members[x], members[y]))
+    return pairs
+
+
+def find_duplicates(df, text_col="transcript_text", group_col="club", threshold=CONTAINMENT_THRESHOLD):
+    """Cluster near-duplicate and contained transcripts.
+
+    Returns a copy of `df` with `canonical_index` (row index of the copy kept
+    for that cluster), `jaccard` and `containment` (against the canonical copy)
+    and `n_shingles` columns.
+    """
+    df = df.reset_index(drop=True)
+    shingle_sets = [shingles(t) for t in df[text_col]]
+    signatures = minhash_signatures(shingle_sets)
+    pairs = candidate_pairs(signatures, df[group_col].tolist())
+
+    # Union-find over verified pairs
+    parent = list(range(len(df)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        smaller = min(shingle_sets[i].size, shingle_sets[j].size)
+        overlap = np.intersect1d(shingle_sets[i], shingle_sets[j], assume_unique=True).size
+        if smaller and overlap / smaller >= threshold:
+            parent[find(i)] = find(j)
+
+    # Keep the longest copy in each cluster, earliest published on ties
+    out = df.copy()
+    out["n_shingles"] = [s.size for s in shingle_sets]
+    out["cluster"] = [find(i) for i in range(len(df))]
+    heads = out.sort_values(["n_shingles", "publish_date"], ascending=[False, True]).drop_duplicates("cluster")
+    out["canonical_index"] = out["cluster"].map(pd.Series(heads.index, index=heads["cluster"]))
+
+    jaccard, containment = [], []
+    for i, c in zip(out.index, out["canonical_index"]):
+        overlap = np.intersect1d(shingle_sets[i], shingle_sets[c], assume_unique=True).size
+        union = shingle_sets[i].size + shingle_sets[c].size - overlap
+        jaccard.append(overlap / union if union else 1.0)
+        containment.append(overlap / shingle_sets[i].size if shingle_sets[i].size else 1.0)
+    out["jaccard"] = jaccard
+    out["containment"] = containment
+    return out.drop(columns="cluster")
+
+
+def main():
+    nltk.download("punkt")
+
+    df = pd.read_csv(INPUT_PATH)
+    result = find_duplicates(df)
+    is_canonical = result["canonical_index"] == result.index
+
+    # Canonical transcripts only, in the original schema
+    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
+    df[is_canonical.to_numpy()].to_csv(OUTPUT_PATH, index=False)
+
+    # Report of what was collapsed into what
+    dropped = result[~is_canonical].copy()
+    dropped["canonical_video_url"] = result.loc[dropped["canonical_index"], "video_url"].to_numpy()
+    report = dropped[[
+        "club", "video_url", "playlist_label", "publish_date", "canonical_video_url",
+        "n_shingles", "jaccard", "containment"
+    ]]
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    report.to_csv(REPORT_PATH, index=False)
+
+    print(f"✅ Kept {is_canonical.sum()} of {len(df)} transcripts; collapsed {len(report)} duplicates")
+    print(f"   Canonical transcripts: {OUTPUT_PATH}")
+    print(f"   Duplicate report: {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
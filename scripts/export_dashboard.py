@@ -0,0 +1,87 @@
+import json
+import os
+import pandas as pd
+import yaml
+
+from weekly_ranks import compute_weekly_ranks
+
+# Parameters
+WORD_COUNT_THRESHOLD = 50000  # Minimum total words required for a club to be included
+TOP_CLICHES = 25
+DECIMALS = 3
+
+# Paths
+weekly_path = "data/processed/cliches_by_week.csv"
+club_path = "data/processed/cliches_by_club.csv"
+club_ci_path = "data/processed/cliches_by_club_ci.csv"
+manager_path = "data/processed/cliches_by_manager.csv"
+favourites_path = "data/processed/favourite_cliches.csv"
+colours_path = "data/club_colours.yaml"
+template_path = os.path.join(os.path.dirname(__file__), "dashboard_template.html")
+output_dir = "data/outputs/web"
+
+
+def records(df, columns):
+    """Compact list-of-lists rows, with floats rounded, for the given columns."""
+    return df[columns].round(DECIMALS).astype(object).where(df[columns].notna(), None).values.tolist()
+
+
+# Load data
+weekly_df = pd.read_csv(weekly_path, parse_dates=["publish_date", "week"])
+club_df = pd.read_csv(club_path)
+manager_df = pd.read_csv(manager_path)
+favourites_df = pd.read_csv(favourites_path)
+with open(colours_path) as f:
+    club_colours = yaml.safe_load(f)
+
+# Filter out clubs below threshold
+valid_clubs = club_df.loc[club_df["word_count"] >= WORD_COUNT_THRESHOLD, "club"].tolist()
+
+# League table, with bootstrap CIs if bootstrap_ci.py has been run
+league = club_df[club_df["club"].isin(valid_clubs)]
+league_columns = ["club", "cliches_per_10000_words", "cliche_count", "word_count"]
+if os.path.exists(club_ci_path):
+    league = league.merge(pd.read_csv(club_ci_path)[["club", "ci_low", "ci_high"]], on="club", how="left")
+    league_columns += ["ci_low", "ci_high"]
+league = league.sort_values("cliches_per_10000_words", ascending=False)
+
+# Cumulative weekly ranks, one array per club aligned to the shared week list
+weekly_avg = compute_weekly_ranks(weekly_df[weekly_df["club"].isin(valid_clubs)])
+weeks = sorted(weekly_avg["week"].unique())
+rank_grid = weekly_avg.pivot(index="week", columns="club", values="rank").reindex(weeks)
+rate_grid = weekly_avg.pivot(index="week", columns="club", values="cum_cliches_per_10000_words").reindex(weeks)
+
+# Managers and overall cliché totals
+managers = manager_df[manager_df["word_count"] >= WORD_COUNT_THRESHOLD].sort_values(
+    "cliches_per_10000_words", ascending=False
+)
+top_cliches = favourites_df.groupby("cliche")["count"].sum().sort_values(ascending=False).head(TOP_CLICHES)
+
+chart_data = {
+    "league": {"columns": league_columns, "rows": records(league, league_columns)},
+    "managers": {
+        "columns": ["club", "manager", "cliches_per_10000_words", "word_count"],
+        "rows": records(managers, ["club", "manager", "cliches_per_10000_words", "word_count"]),
+    },
+    "weekly": {
+        "weeks": [pd.Timestamp(w).strftime("%Y-%m-%d") for w in weeks],
+        "rank": {club: rank_grid[club].astype(int).tolist() for club in rank_grid.columns},
+        "rate": {club: rate_grid[club].round(DECIMALS).tolist() for club in rate_grid.columns},
+    },
+    "cliches": [[cliche, int(count)] for cliche, count in top_cliches.items()],
+    "colours": {club: club_colours.get(club, "#444444") for club in valid_clubs},
+}
+
+# Save compact JSON plus a self-contained HTML page (data inlined so it opens from disk)
+os.makedirs(output_dir, exist_ok=True)
+payload = json.dumps(chart_data, separators=(",", ":"), ensure_ascii=False)
+with open(os.path.join(output_dir, "chart_data.json"), "w", encoding="utf-8") as f:
+    f.write(payload)
+
+with open(template_path, encoding="utf-8") as f:
+    template = f.read()
+with open(os.path.join(output_dir, "index.html"), "w", encoding="utf-8") as f:
+    f.write(template.replace("/*CHART_DATA*/null", payload.replace("</", "<\\/")))
+
+size_kb = (len(payload.encode("utf-8")) + len(template.encode("utf-8"))) / 1024
+print(f"✅ Dashboard saved to {output_dir}/index.html ({size_kb:.0f} KB with data)")
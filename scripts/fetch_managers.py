@@ -1,17 +1,16 @@
-import requests
 import pandas as pd
 from datetime import datetime, date, timedelta
 import os
 from dotenv import load_dotenv
 
+from api_client import ApiClient
+
 # Load API key
 load_dotenv()
 API_KEY = os.getenv("API_FOOTBALL_KEY")
 
-headers = {
-    'x-rapidapi-host': "v3.football.api-sports.io",
-    'x-rapidapi-key': API_KEY
-}
+# Shared pooled + cached client (set API_FOOTBALL_BASE_URL to point at a stub server)
+client = ApiClient(API_KEY, cache_ttl=int(os.getenv("API_FOOTBALL_CACHE_TTL", 24 * 60 * 60)))
 
 # Season boundaries
 SEASON_START = date(2024, 8, 1)
@@ -22,9 +21,7 @@ TODAY = date.today()
 league_id = 39
 season = 2024
 
-teams_url = f'https://v3.football.api-sports.io/teams?league={league_id}&season={season}'
-teams_res = requests.get(teams_url, headers=headers)
-teams = teams_res.json().get("response", [])
+teams = client.get("teams", league=league_id, season=season).get("response", [])
 team_ids = {team["team"]["id"]: team["team"]["name"] for team in teams}
 
 # Extract and save club badge URLs
@@ -52,17 +49,17 @@ def parse_date(d):
 
 tenures = []
 
-for team_id, team_name in team_ids.items():
-    print(f"🔍 {team_name}")
+# Fetch every team's coaches concurrently, then process in team order
+coach_responses = client.get_many("coachs", [{"team": team_id} for team_id in team_ids])
 
-    coach_url = f"https://v3.football.api-sports.io/coachs?team={team_id}"
-    coach_res = requests.get(coach_url, headers=headers)
+for (team_id, team_name), coach_res in zip(team_ids.items(), coach_responses):
+    print(f"🔍 {team_name}")
 
-    if coach_res.status_code != 200:
-        print(f"  ❌ Failed: {coach_res.json()}")
+    if isinstance(coach_res, Exception):
+        print(f"  ❌ Failed: {coach_res}")
         continue
 
-    for coach in coach_res.json().get("response", []):
+    for coach in coach_res.get("response", []):
         name = coach.get("name", "Unknown")
         photo_url = coach.get("photo", "")
 
@@ -108,3 +105,4 @@ os.makedirs("data/raw", exist_ok=True)
 df.to_csv("data/raw/managers.csv", index=False)
 
 print(f"\n✅ Saved {len(df)} manager tenures active during 2024/25 season to data/raw/managers.csv")
+print(f"🌐 {client.network_calls} network calls made (rest served from {client.cache_dir})")
@@ -6,6 +6,8 @@ from pytube import Playlist, YouTube
 from youtube_transcript_api import YouTubeTranscriptApi
 from datetime import datetime, date
 
+from clean_captions import clean_segments
+
 # Paths
 CONFIG_PATH = "data/playlists.yaml"
 TENURES_PATH = "data/raw/managers.csv"
@@ -62,7 +64,8 @@ for club, info in playlists_config.items():
 
                 print(f"    ▶️ Fetching transcript for: {video_url}")
                 transcript = YouTubeTranscriptApi.get_transcript(yt.video_id)
-                full_text = " ".join([t["text"] for t in transcript])
+                full_text, tokens_removed = clean_segments([t["text"] for t in transcript])
+                print(f"    🧹 Removed {tokens_removed} duplicate or non-speech tokens")
 
                 manager = find_manager(club, publish_date)
 
@@ -73,7 +76,8 @@ for club, info in playlists_config.items():
                     "video_id": yt.video_id,
                     "video_url": video_url,
                     "publish_date": publish_date.isoformat(),
-                    "transcript_text": full_text
+                    "transcript_text": full_text,
+                    "tokens_removed": tokens_removed
                 })
 
                 time.sleep(1)
@@ -1,88 +1,278 @@
+import argparse
+import numpy as np
 import pandas as pd
 import yaml
 import nltk
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 import os
 
-nltk.download("punkt")
+from cliche_patterns import ClicheCatalogue
+from phonetic_index import PhoneticIndex
 
 # --- Config ---
-TRANSCRIPT_PATH = "data/raw/transcripts.csv"
+TRANSCRIPT_PATH = "data/raw/transcripts_canonical.csv"
 CLICHE_PATH = "data/cliches.yaml"
-OUTPUT_MATCHES = "data/processed/cliche_matches.csv"
+OUTPUT_DIR = "data/processed"
+MATCHES_FILE = "cliche_matches.npy"  # MATCH_DTYPE records
+DIM_TRANSCRIPTS_FILE = "dim_transcripts.csv"  # transcript_id -> video_url, club, publish_date
+DIM_CLICHES_FILE = "dim_cliches.csv"  # cliche_id -> cliche
 FUZZY_THRESHOLD = 95
-WINDOW_SIZE = 8  # Use a fixed window size
+WINDOW_TOLERANCE = 1  # Extra tokens a window may have beyond the cliché's own length
+PROXIMITY = 10  # Hits of the same cliché closer than this many tokens are duplicates
+
+
+# --- Tokenisation ---
+def tokenize(text):
+    return nltk.word_tokenize(str(text).lower())
+
 
 # --- Load cliché list ---
-with open(CLICHE_PATH) as f:
-    cliches = yaml.safe_load(f)["cliches"]
+def load_cliches(path=CLICHE_PATH):
+    """Compile the cliché templates in `path` into a single-pass catalogue."""
+    with open(path) as f:
+        return ClicheCatalogue(yaml.safe_load(f)["cliches"], tokenize)
+
+
+def bucket_cliches(catalogue):
+    """Group clichés by the token length of their fuzzy form so each group can share windows.
+
+    Returns {length: (cliche_ids, forms)}. Forms are the canonical templates re-joined
+    from their tokens, so they are scored in the same shape as the windows
+    (e.g. "it's" becomes "it 's").
+    """
+    buckets = {}
+    for cliche_id, form in enumerate(catalogue.fuzzy_forms):
+        ids, forms = buckets.setdefault(len(form.split()), ([], []))
+        ids.append(cliche_id)
+        forms.append(form)
+    return dict(sorted(buckets.items()))
+
+
+def phonetic_index(catalogue):
+    """Phonetic index over the catalogue's fuzzy forms, as used by every matching entry point."""
+    return PhoneticIndex(catalogue.fuzzy_forms, tolerance=WINDOW_TOLERANCE)
 
-# --- Load transcripts ---
-df = pd.read_csv(TRANSCRIPT_PATH)
 
 # --- Sliding window generator ---
-def generate_windows(tokens, size):
-    return [" ".join(tokens[i:i+size]) for i in range(len(tokens) - size + 1)]
-
-# --- Fuzzy matching ---
-def match_cliches_in_transcript(text, threshold=FUZZY_THRESHOLD, window_size=WINDOW_SIZE, proximity=10):
-    tokens = nltk.word_tokenize(text.lower())
-    matches = []
-
-    for i in range(len(tokens) - window_size + 1):
-        window_tokens = tokens[i:i + window_size]
-        window_text = " ".join(window_tokens)
-
-        for cliche in cliches:
-            score = fuzz.partial_ratio(window_text, cliche)
-            if score >= threshold:
-                matches.append({
-                    "cliche": cliche,
-                    "matched_text": window_text,
-                    "score": score,
-                    "position": i
-                })
-
-    # Deduplicate based on proximity and score
-    kept = []
-    for m in matches:
-        too_close = False
-        for k in kept:
-            if (
-                m["cliche"] == k["cliche"] and
-                abs(m["position"] - k["position"]) < proximity
-            ):
-                # Keep only the better one
-                if m["score"] > k["score"]:
-                    kept.remove(k)
-                    kept.append(m)
-                too_close = True
-                break
-        if not too_close:
-            kept.append(m)
-
-    # Drop 'position' from final output
-    for m in kept:
-        m.pop("position")
-
-    return kept
-
-# --- Run matching ---
-print("🔍 Matching clichés using a fixed window size...")
-all_matches = []
-
-for _, row in df.iterrows():
-    matches = match_cliches_in_transcript(row["transcript_text"])
-    for m in matches:
-        m.update({
-            "club": row["club"],
-            "publish_date": row["publish_date"],
-            "video_url": row["video_url"]
-        })
-        all_matches.append(m)
-
-# --- Save output ---
-os.makedirs(os.path.dirname(OUTPUT_MATCHES), exist_ok=True)
-pd.DataFrame(all_matches).to_csv(OUTPUT_MATCHES, index=False)
-
-print(f"✅ Done! Saved fuzzy cliché matches to: {OUTPUT_MATCHES}")
+def generate_windows(tokens, size, starts=None):
+    if starts is None:
+        starts = range(len(tokens) - size + 1)
+    return [" ".join(tokens[i:i+size]) for i in starts]
+
+
+# --- Match records ---
+# One row per hit; strings live in the dimension tables written alongside
+MATCH_DTYPE = np.dtype([
+    ("cliche_id", np.uint16),
+    ("transcript_id", np.uint32),
+    ("start", np.uint32),  # Token span [start, end) in the tokenised transcript
+    ("end", np.uint32),
+    ("score", np.uint8),
+    ("method", np.uint8),  # EXACT, FUZZY or PHONETIC
+])
+EXACT, FUZZY, PHONETIC = 0, 1, 2
+
+
+# --- Deduplication ---
+def deduplicate(matches, proximity=PROXIMITY):
+    """Collapse hits of the same cliché within `proximity` tokens, keeping the best score.
+
+    `matches` is a MATCH_DTYPE array, possibly spanning several transcripts;
+    the result is sorted by transcript and start position.
+    """
+    if len(matches) < 2:
+        return matches
+    order = np.lexsort((
+        -matches["score"].astype(np.int16), matches["start"], matches["cliche_id"], matches["transcript_id"]
+    ))
+    transcript_ids = matches["transcript_id"].tolist()
+    cliche_ids = matches["cliche_id"].tolist()
+    starts = matches["start"].tolist()
+    scores = matches["score"].tolist()
+    keep = []
+    for i in order.tolist():
+        k = keep[-1] if keep else None
+        if (
+            k is not None and transcript_ids[k] == transcript_ids[i] and cliche_ids[k] == cliche_ids[i]
+            and starts[i] - starts[k] < proximity
+        ):
+            if scores[i] > scores[k]:
+                keep[-1] = i
+        else:
+            keep.append(i)
+    kept = matches[keep]
+    return kept[np.lexsort((kept["start"], kept["transcript_id"]))]
+
+
+# --- Matching ---
+def score_candidates(tokens, catalogue, buckets, transcript_id=0, threshold=FUZZY_THRESHOLD, tolerance=WINDOW_TOLERANCE,
+                     phonetic=None):
+    """Every exact hit plus every fuzzy window scoring at least `threshold`, before dedup.
+
+    The compiled catalogue finds every exact/template hit in a single pass.
+    Fuzzy scoring then only covers windows that touch no exact hit, so it
+    is left to pick up ASR-mangled phrases. Each fuzzy cliché is scored only
+    against windows of its own length (up to `tolerance` longer). Windows
+    of each size are built once from the shared token list and reused by
+    every length bucket. Windows shorter than a cliché are never used, since
+    `partial_ratio` would then match any fragment of it.
+
+    If a `PhoneticIndex` is given, it adds hits for caption misrecognitions
+    that only match by sound, again outside the exact hits.
+    """
+    hits = []
+
+    covered = np.zeros(len(tokens) + 1, dtype=np.int64)
+    for idx, start, end in catalogue.scan(tokens):
+        hits.append((idx, transcript_id, start, end, 100, EXACT))
+        covered[start:end] = 1
+    covered_before = np.concatenate([[0], np.cumsum(covered)])
+
+    windows_by_size = {}
+    for length, (ids, forms) in buckets.items():
+        for size in range(length, length + tolerance + 1):
+            if size not in windows_by_size:
+                # Only windows that overlap no exact hit
+                starts = np.arange(max(len(tokens) - size + 1, 0))
+                starts = starts[covered_before[starts + size] == covered_before[starts]]
+                windows_by_size[size] = (starts, generate_windows(tokens, size, starts))
+            starts, windows = windows_by_size[size]
+            if not windows:
+                continue
+
+            scores = process.cdist(windows, forms, scorer=fuzz.partial_ratio, score_cutoff=threshold, workers=-1)
+            for i, j in zip(*scores.nonzero()):
+                # Floored, so a stored score >= T exactly when the raw score >= T (the sweep relies on this)
+                hits.append((ids[j], transcript_id, starts[i], starts[i] + size, int(scores[i, j]), FUZZY))
+
+    if phonetic is not None:
+        overlaps_exact = lambda start, end: covered_before[end] != covered_before[start]
+        for idx, start, end, score in phonetic.scan(tokens, skip=overlaps_exact):
+            hits.append((idx, transcript_id, start, end, score, PHONETIC))
+
+    return np.array(hits, dtype=MATCH_DTYPE)
+
+
+def match_cliches_in_transcript(text, catalogue, buckets, transcript_id=0, threshold=FUZZY_THRESHOLD,
+                                tolerance=WINDOW_TOLERANCE, proximity=PROXIMITY, phonetic=None):
+    """Return a MATCH_DTYPE array of deduplicated hits for one transcript."""
+    candidates = score_candidates(tokenize(text), catalogue, buckets, transcript_id, threshold, tolerance, phonetic)
+    return deduplicate(candidates, proximity)
+
+
+def transcript_dimension(df):
+    """Dimension table mapping transcript_id (row position) to its metadata."""
+    dim = df[["video_url", "club", "publish_date"]].copy()
+    dim.insert(0, "transcript_id", np.arange(len(df), dtype=np.uint32))
+    return dim
+
+
+def cliche_dimension(catalogue):
+    return pd.DataFrame({"cliche_id": np.arange(len(catalogue.names), dtype=np.uint16), "cliche": catalogue.names})
+
+
+def save_matches(matches, dim_transcripts, dim_cliches, output_dir=OUTPUT_DIR):
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(os.path.join(output_dir, MATCHES_FILE), matches)
+    dim_transcripts.to_csv(os.path.join(output_dir, DIM_TRANSCRIPTS_FILE), index=False)
+    dim_cliches.to_csv(os.path.join(output_dir, DIM_CLICHES_FILE), index=False)
+
+
+def load_matches(output_dir=OUTPUT_DIR):
+    """Return (matches, dim_transcripts, dim_cliches) as written by `save_matches`."""
+    matches = np.load(os.path.join(output_dir, MATCHES_FILE))
+    dim_transcripts = pd.read_csv(os.path.join(output_dir, DIM_TRANSCRIPTS_FILE))
+    dim_cliches = pd.read_csv(os.path.join(output_dir, DIM_CLICHES_FILE))
+    return matches, dim_transcripts, dim_cliches
+
+
+def decode_matches(matches, dim_transcripts, dim_cliches):
+    """Readable DataFrame of matches (one row per hit, with strings joined back on)."""
+    df = pd.DataFrame(matches)
+    df = df.merge(dim_cliches, on="cliche_id", how="left")
+    return df.merge(dim_transcripts, on="transcript_id", how="left")
+
+
+# --- Comparison against the previous run ---
+def compare_with_previous(new_df, output_dir=OUTPUT_DIR):
+    """Print precision/recall of `new_df` against the matches currently on disk.
+
+    Hits are compared as (video_url, cliche) counts, so a transcript with two
+    "at the end of the day" hits in both runs counts as two agreements.
+    """
+    if not os.path.exists(os.path.join(output_dir, MATCHES_FILE)) or new_df.empty:
+        return
+    old_df = decode_matches(*load_matches(output_dir))
+    if old_df.empty:
+        return
+    old = old_df.groupby(["video_url", "cliche"]).size()
+    new = new_df.groupby(["video_url", "cliche"]).size()
+    old, new = old.align(new, fill_value=0)
+    agreed, old_total, new_total = int(old.combine(new, min).sum()), int(old.sum()), int(new.sum())
+    print(
+        f"📊 vs previous output: precision {agreed / new_total:.3f}, recall {agreed / old_total:.3f} "
+        f"({new_total} matches now, {old_total} before)"
+    )
+
+
+def previous_matches_by_url(catalogue, output_dir=OUTPUT_DIR):
+    """Matches from the last run keyed by video_url, if they used the same catalogue."""
+    if not os.path.exists(os.path.join(output_dir, MATCHES_FILE)):
+        return {}
+    matches, dim_transcripts, dim_cliches = load_matches(output_dir)
+    if dim_cliches["cliche"].tolist() != catalogue.names or matches.dtype != MATCH_DTYPE:
+        print("⚠️ Cliché catalogue or match format changed since the last run, rematching everything")
+        return {}
+    matches = matches[np.argsort(matches["transcript_id"], kind="stable")]
+    bounds = np.searchsorted(matches["transcript_id"], np.arange(len(dim_transcripts) + 1))
+    return {
+        url: matches[bounds[t]:bounds[t + 1]]
+        for url, t in zip(dim_transcripts["video_url"], dim_transcripts["transcript_id"])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find clichés in press conference transcripts.")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Reuse stored matches for transcripts already matched and only match new ones"
+    )
+    args = parser.parse_args()
+
+    nltk.download("punkt")
+
+    catalogue = load_cliches()
+    buckets = bucket_cliches(catalogue)
+    phonetic = phonetic_index(catalogue)
+    df = pd.read_csv(TRANSCRIPT_PATH)
+    previous = previous_matches_by_url(catalogue) if args.incremental else {}
+
+    # --- Run matching ---
+    print(
+        f"🔍 Matching {len(catalogue.names)} clichés (fuzzy fallback in {len(buckets)} length buckets, "
+        f"{len(phonetic.codes)} with a phonetic index)..."
+    )
+    per_transcript = []
+    for i, (url, text) in enumerate(zip(df["video_url"], df["transcript_text"])):
+        if url in previous:
+            m = previous[url].copy()
+            m["transcript_id"] = i
+        else:
+            m = match_cliches_in_transcript(text, catalogue, buckets, transcript_id=i, phonetic=phonetic)
+        per_transcript.append(m)
+    matches = np.concatenate(per_transcript) if per_transcript else np.empty(0, dtype=MATCH_DTYPE)
+    if previous:
+        print(f"   Reused stored matches for {df['video_url'].isin(previous.keys()).sum()} transcripts")
+
+    # --- Save output ---
+    dim_transcripts = transcript_dimension(df)
+    dim_cliches = cliche_dimension(catalogue)
+    if not previous:
+        compare_with_previous(decode_matches(matches, dim_transcripts, dim_cliches))
+    save_matches(matches, dim_transcripts, dim_cliches)
+
+    print(f"✅ Done! Saved {len(matches)} cliché matches to: {os.path.join(OUTPUT_DIR, MATCHES_FILE)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import os
+import pandas as pd
+
+from aggregates import TOTAL_COLUMNS
+from weekly_ranks import per_10000, rank_weeks
+
+# Paths
+WEEKLY_TOTALS_PATH = "data/processed/weekly_totals.csv"  # Written by process_cliches.py
+RANKS_PATH = "data/processed/club_weekly_ranks.csv"
+OUTPUT_DIR = "data/processed"
+CLUB_FORM_FILE = "club_form.csv"  # Full club-week grid with rolling metrics
+MANAGER_FORM_FILE = "manager_form.csv"
+FORM_TABLE_FILE = "form_table.csv"  # Latest week only, next to the season-to-date rank
+
+# Parameters
+WINDOW_WEEKS = 4
+HALFLIFE_WEEKS = 2
+MIN_WINDOW_WORDS = 1000  # Rates over fewer words are left blank and unranked
+MIN_SEASON_WORDS = 50000  # Same threshold as the league table; clubs below it get no season rank
+
+
+def weekly_grid(weekly, keys):
+    """Totals for every `keys` group in every calendar week, with zeros for weeks without transcripts.
+
+    Weeks with no transcripts at all (international and summer breaks) are
+    included too, so that rolling windows over rows span calendar weeks.
+    """
+    totals = weekly.groupby(keys + ["week"])[TOTAL_COLUMNS].sum()
+    groups = totals.reset_index()[keys].drop_duplicates()
+    week_starts = totals.index.get_level_values("week")
+    weeks = pd.DataFrame({"week": pd.date_range(week_starts.min(), week_starts.max(), freq="7D")})
+    full_index = pd.MultiIndex.from_frame(groups.merge(weeks, how="cross"))
+    return totals.reindex(full_index, fill_value=0).reset_index().sort_values(keys + ["week"], ignore_index=True)
+
+
+def rolling_rates(grid, keys, window=WINDOW_WEEKS, halflife=HALFLIFE_WEEKS, min_words=MIN_WINDOW_WORDS):
+    """Add N-week rolling and exponentially weighted rates, their ranks and week-over-week rank changes.
+
+    Rates are ratios of summed (or weighted) counts to words rather than
+    averages of weekly rates, so a quiet week weighs as little as its word
+    count. All groups are computed together with grouped rolling/ewm ops;
+    `grid` must have one row per calendar week and be sorted by `keys` then
+    week, as from `weekly_grid`, so `window` and `halflife` are in weeks.
+    """
+    grid = grid.copy()
+    grouped = grid.groupby(keys, sort=True)[TOTAL_COLUMNS]
+
+    rolling = grouped.rolling(window, min_periods=1).sum().to_numpy()
+    words = pd.Series(rolling[:, 1], index=grid.index)
+    grid[f"rolling_{window}w_word_count"] = words
+    grid[f"rolling_{window}w_rate"] = per_10000(pd.Series(rolling[:, 0], index=grid.index), words).where(words >= min_words)
+
+    ewm = grouped.ewm(halflife=halflife).mean().to_numpy()
+    grid["ewm_rate"] = per_10000(pd.Series(ewm[:, 0], index=grid.index), pd.Series(ewm[:, 1], index=grid.index))
+    grid["ewm_rate"] = grid["ewm_rate"].where(words >= min_words)
+
+    # Rank within each week (1 = most clichés) and change since the previous week (positive = climbed)
+    for rate in (f"rolling_{window}w_rate", "ewm_rate"):
+        rank = rate.replace("_rate", "_rank")
+        grid[rank] = grid.groupby("week")[rate].rank(ascending=False, method="min").astype("Int64")
+        grid[f"{rank}_change"] = grid.groupby(keys)[rank].shift(1) - grid[rank]
+    return grid
+
+
+def form_table(club_form, ranks, window=WINDOW_WEEKS, min_season_words=MIN_SEASON_WORDS):
+    """Latest-week form for every ranked club, alongside its season-to-date rank.
+
+    Season ranks are recomputed among clubs with at least `min_season_words`
+    words, as in the league table; other clubs keep their form but no season rank.
+    """
+    latest = club_form[club_form["week"] == club_form["week"].max()]
+    latest = latest.dropna(subset=[f"rolling_{window}w_rate"])
+    club_word_totals = ranks.groupby("club")["cum_word_count"].max()
+    valid_clubs = club_word_totals[club_word_totals >= min_season_words].index
+    season = rank_weeks(ranks[ranks["club"].isin(valid_clubs)])
+    season = season[season["week"] == ranks["week"].max()][["club", "rank", "cum_cliches_per_10000_words"]]
+    table = latest.merge(season.rename(columns={"rank": "season_rank"}), on="club", how="left")
+    table["season_rank"] = table["season_rank"].astype("Int64")
+    columns = [
+        "club", f"rolling_{window}w_rank", f"rolling_{window}w_rank_change", f"rolling_{window}w_rate",
+        "ewm_rank", "ewm_rate", "season_rank", "cum_cliches_per_10000_words",
+    ]
+    return table.sort_values(f"rolling_{window}w_rank")[columns].reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling cliché rates and the current form table.")
+    parser.add_argument("--window", type=int, default=WINDOW_WEEKS, help="Weeks in the rolling window")
+    parser.add_argument("--halflife", type=float, default=HALFLIFE_WEEKS, help="Half-life in weeks for the weighted rate")
+    parser.add_argument("--min-words", type=int, default=MIN_WINDOW_WORDS, help="Words a window needs to be ranked")
+    parser.add_argument("--min-season-words", type=int, default=MIN_SEASON_WORDS,
+                        help="Words a club needs for a season rank")
+    args = parser.parse_args()
+
+    weekly = pd.read_csv(WEEKLY_TOTALS_PATH, parse_dates=["week"])
+    ranks = pd.read_csv(RANKS_PATH, parse_dates=["week"])
+
+    club_form = rolling_rates(weekly_grid(weekly, ["club"]), ["club"], args.window, args.halflife, args.min_words)
+    manager_form = rolling_rates(
+        weekly_grid(weekly, ["club", "manager"]), ["club", "manager"], args.window, args.halflife, args.min_words
+    )
+    table = form_table(club_form, ranks, args.window, args.min_season_words)
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    club_form.to_csv(os.path.join(OUTPUT_DIR, CLUB_FORM_FILE), index=False)
+    manager_form.to_csv(os.path.join(OUTPUT_DIR, MANAGER_FORM_FILE), index=False)
+    table.to_csv(os.path.join(OUTPUT_DIR, FORM_TABLE_FILE), index=False)
+
+    print(f"✅ Form table for the week of {club_form['week'].max():%Y-%m-%d} saved to {OUTPUT_DIR}")
+    print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Paths
+FAVOURITES_PATH = "data/processed/favourite_cliches.csv"  # Counts per club, manager and cliché
+MANAGER_PATH = "data/processed/cliches_by_manager.csv"  # Word totals per club and manager
+OUTPUT_DIR = "data/processed"
+MATRIX_FILE = "manager_similarity.npz"  # Sparse cosine similarity, rows/columns as in the profiles file
+PROFILES_FILE = "manager_profiles.csv"  # Row order of the matrix with each profile's word count
+NEIGHBOURS_FILE = "manager_neighbours.csv"
+
+# Parameters
+MIN_WORDS = 10000  # Profiles built from fewer words are too noisy to compare
+TOP_K = 5
+
+
+def profile_keys(df, by):
+    """Profile label per row: the manager across all their clubs, or one club-manager stint."""
+    if by == "manager":
+        return df["manager"]
+    return df["manager"] + " (" + df["club"] + ")"
+
+
+def tfidf_matrix(counts, words, by="manager", min_words=MIN_WORDS):
+    """Sparse profile × cliché TF-IDF matrix with L2-normalised rows.
+
+    Returns (matrix, profiles) where `profiles` holds each row's label and
+    word count. Term frequency is the raw count (row normalisation removes
+    talkativeness); IDF is smoothed as in scikit-learn, so clichés everyone
+    uses count for little.
+    """
+    counts = counts[counts["manager"] != "Unknown"].assign(profile=lambda d: profile_keys(d, by))
+    words = words[words["manager"] != "Unknown"].assign(profile=lambda d: profile_keys(d, by))
+    word_totals = words.groupby("profile")["word_count"].sum()
+    word_totals = word_totals[word_totals >= min_words]
+    counts = counts[counts["profile"].isin(word_totals.index)]
+
+    rows, profiles = pd.factorize(counts["profile"], sort=True)
+    cols, cliches = pd.factorize(counts["cliche"], sort=True)
+    matrix = sparse.csr_matrix(
+        (counts["count"].to_numpy(dtype=np.float64), (rows, cols)), shape=(len(profiles), len(cliches))
+    )
+    matrix.sum_duplicates()
+
+    n_docs = matrix.shape[0]
+    document_frequency = np.bincount(matrix.indices, minlength=matrix.shape[1])
+    idf = np.log((1 + n_docs) / (1 + document_frequency)) + 1
+    matrix = matrix @ sparse.diags(idf)
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    matrix = sparse.diags(1 / np.where(norms > 0, norms, 1)) @ matrix
+
+    profiles = pd.DataFrame({"profile": profiles, "word_count": word_totals.reindex(profiles).to_numpy()})
+    return matrix.tocsr(), profiles
+
+
+def cosine_similarity(matrix):
+    """Pairwise cosine similarity of L2-normalised rows, kept sparse, without self-similarity."""
+    similarity = (matrix @ matrix.T).tocsr()
+    similarity = (similarity - sparse.diags(similarity.diagonal())).tocsr()
+    similarity.eliminate_zeros()
+    return similarity
+
+
+def top_k(similarity, k=TOP_K):
+    """Each row's `k` most similar rows as (row, neighbour, similarity, rank) arrays.
+
+    Works on the CSR arrays directly: one lexsort orders every row's
+    entries by descending similarity, and the position within the row
+    gives the rank.
+    """
+    rows = np.repeat(np.arange(similarity.shape[0]), np.diff(similarity.indptr))
+    order = np.lexsort((-similarity.data, rows))
+    rows, cols, values = rows[order], similarity.indices[order], similarity.data[order]
+    rank = np.arange(len(rows)) - similarity.indptr[rows] + 1
+    keep = rank <= k
+    return rows[keep], cols[keep], values[keep], rank[keep]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Who sounds like whom: manager cliché-profile similarity.")
+    parser.add_argument("--by", choices=["manager", "stint"], default="manager",
+                        help="One profile per manager, or one per club-manager stint")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--min-words", type=int, default=MIN_WORDS)
+    args = parser.parse_args()
+
+    counts = pd.read_csv(FAVOURITES_PATH)
+    words = pd.read_csv(MANAGER_PATH)
+    matrix, profiles = tfidf_matrix(counts, words, args.by, args.min_words)
+    similarity = cosine_similarity(matrix)
+    rows, cols, values, rank = top_k(similarity, args.top_k)
+
+    neighbours = pd.DataFrame({
+        "profile": profiles["profile"].to_numpy()[rows],
+        "rank": rank,
+        "neighbour": profiles["profile"].to_numpy()[cols],
+        "similarity": values,
+    })
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    sparse.save_npz(os.path.join(OUTPUT_DIR, MATRIX_FILE), similarity)
+    profiles.to_csv(os.path.join(OUTPUT_DIR, PROFILES_FILE), index=False)
+    neighbours.to_csv(os.path.join(OUTPUT_DIR, NEIGHBOURS_FILE), index=False)
+    print(f"✅ Similarity of {len(profiles)} profiles over {matrix.shape[1]} clichés saved to {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+from rapidfuzz import fuzz
+
+# Auto-captions garble clichés into words that sound alike ("packing the bus")
+# or split words in the wrong place ("then eck"). Both survive phonetic
+# encoding of the window with the spaces removed, which the character-level
+# fuzzy pass does not see.
+PHONETIC_THRESHOLD = 90  # fuzz.ratio between phonetic codes
+SPELLING_FLOOR = 75  # fuzz.ratio between the letters run together; rejects sound-alikes that look nothing alike
+GROUP_THRESHOLD = 80  # fuzz.ratio between aligned token codes; shorter codes must be equal
+FUZZY_GROUP_LENGTH = 4  # Codes at least this long may differ slightly
+MIN_CODE_LENGTH = 6  # Shorter codes match too much by accident
+MIN_ANCHOR_LENGTH = 2  # Token codes used to look clichés up ("0" for "the" is useless)
+
+VOWELS = set("aeiou")
+NON_LETTERS = re.compile(r"[^a-z]")
+
+
+@lru_cache(maxsize=None)
+def metaphone(word):
+    """Simplified Metaphone code for a lowercase word.
+
+    Follows the original Metaphone rules, except that 'r' is only kept
+    before a vowel: the speakers are mostly non-rhotic, so "parking" is
+    heard as "packing".
+    """
+    w = NON_LETTERS.sub("", word.lower())
+    if not w:
+        return ""
+    if w[:2] in ("kn", "gn", "pn", "wr", "ae"):
+        w = w[1:]
+    elif w[0] == "x":
+        w = "s" + w[1:]
+    elif w[:2] == "wh":
+        w = "w" + w[2:]
+
+    code = []
+    n = len(w)
+    for i, c in enumerate(w):
+        prev = w[i - 1] if i else ""
+        nxt = w[i + 1] if i + 1 < n else ""
+        after = w[i + 2] if i + 2 < n else ""
+        if c == prev and c != "c":
+            continue
+        if c in VOWELS:
+            if i == 0:
+                code.append(c.upper())
+        elif c == "b":
+            if not (prev == "m" and i == n - 1):
+                code.append("B")
+        elif c == "c":
+            if nxt == "h" or (nxt == "i" and after == "a"):
+                code.append("K" if prev == "s" else "X")
+            elif nxt in ("i", "e", "y"):
+                if prev != "s":
+                    code.append("S")
+            else:
+                code.append("K")
+        elif c == "d":
+            code.append("J" if nxt == "g" and after in ("e", "i", "y") else "T")
+        elif c == "g":
+            if nxt == "h" and after and after not in VOWELS:
+                continue
+            if nxt == "n" and (i + 2 == n or w[i + 2:] == "ed"):
+                continue
+            if prev == "d" and nxt in ("e", "i", "y"):
+                continue
+            code.append("J" if nxt in ("i", "e", "y") and prev != "g" else "K")
+        elif c == "h":
+            if nxt in VOWELS and prev not in ("c", "s", "p", "t", "g"):
+                code.append("H")
+        elif c == "k":
+            if prev != "c":
+                code.append("K")
+        elif c == "p":
+            code.append("F" if nxt == "h" else "P")
+        elif c == "q":
+            code.append("K")
+        elif c == "r":
+            if nxt in VOWELS:
+                code.append("R")
+        elif c == "s":
+            code.append("X" if nxt == "h" or (nxt == "i" and after in ("o", "a")) else "S")
+        elif c == "t":
+            if nxt == "i" and after in ("o", "a"):
+                code.append("X")
+            elif nxt == "h":
+                code.append("0")
+            elif not (nxt == "c" and after == "h"):
+                code.append("T")
+        elif c == "v":
+            code.append("F")
+        elif c in ("w", "y"):
+            if nxt in VOWELS:
+                code.append(c.upper())
+        elif c == "x":
+            code.append("KS")
+        elif c == "z":
+            code.append("S")
+        else:
+            code.append(c.upper())
+    return "".join(code)
+
+
+def run_together(tokens):
+    """Letters of the tokens with the spaces removed, so word boundaries don't matter."""
+    return NON_LETTERS.sub("", "".join(tokens))
+
+
+def phrase_code(tokens):
+    return metaphone(run_together(tokens))
+
+
+def codes_agree(a, b, exact):
+    if a == b:
+        return True
+    return (
+        not exact
+        and min(len(a), len(b)) >= FUZZY_GROUP_LENGTH
+        and fuzz.ratio(a, b, score_cutoff=GROUP_THRESHOLD) > 0
+    )
+
+
+def aligned(cliche_tokens, window_tokens):
+    """Whether every cliché token agrees by sound with the window, in order.
+
+    One or two cliché tokens are matched against one or two window tokens,
+    so words the captions split or merged ("the neck" / "then eck") still
+    line up; those groups must sound exactly alike, while single tokens
+    with long codes may differ slightly. Window tokens with no letters
+    (punctuation) may be skipped.
+    Agreement is per token group rather than over the whole phrase, so a
+    different final word ("at the end of the game") cannot hide inside an
+    overall similarity score.
+    """
+    n, m = len(cliche_tokens), len(window_tokens)
+    reachable = [[False] * (m + 1) for _ in range(n + 1)]
+    reachable[0][0] = True
+    for i in range(n + 1):
+        for j in range(m + 1):
+            if not reachable[i][j]:
+                continue
+            if j < m and not metaphone(window_tokens[j]):
+                reachable[i][j + 1] = True
+            for a in (1, 2):
+                for b in (1, 2):
+                    if i + a <= n and j + b <= m and codes_agree(
+                        phrase_code(cliche_tokens[i:i + a]), phrase_code(window_tokens[j:j + b]), exact=a + b > 2
+                    ):
+                        reachable[i + a][j + b] = True
+    return reachable[n][m]
+
+
+class PhoneticIndex:
+    """Inverted index from per-token phonetic codes to clichés.
+
+    A window is only scored for a cliché when it contains at least two of
+    that cliché's distinct token codes (or its only one), so candidate
+    retrieval is a dictionary lookup per token rather than a scan of every
+    window against every cliché. Candidates must agree token by token by
+    sound (`aligned`) and also stay within SPELLING_FLOOR of the cliché's
+    letters; phonetic codes drop vowels, so sound alone lets through
+    unrelated phrases.
+    """
+
+    def __init__(self, forms, threshold=PHONETIC_THRESHOLD, tolerance=1):
+        self.threshold = threshold
+        self.tolerance = tolerance
+        self.codes = []  # (cliche_id, tokens, phrase code, letters) per indexed cliché
+        self.anchors = {}  # token code -> [position in self.codes]
+        self.needed = []  # Distinct anchors a window must contain
+        for cliche_id, form in enumerate(forms):
+            tokens = form.split()
+            code = phrase_code(tokens)
+            anchors = {metaphone(t) for t in tokens} - {""}
+            anchors = {a for a in anchors if len(a) >= MIN_ANCHOR_LENGTH}
+            if len(code) < MIN_CODE_LENGTH or not anchors:
+                continue
+            for anchor in anchors:
+                self.anchors.setdefault(anchor, []).append(len(self.codes))
+            self.codes.append((cliche_id, tokens, code, run_together(tokens)))
+            self.needed.append(min(2, len(anchors)))
+
+    def _candidate_starts(self, positions, needed, span):
+        """Window starts whose `span` tokens contain at least `needed` distinct anchors."""
+        all_positions = sorted(p for ps in positions.values() for p in ps)
+        starts = set()
+        for p in all_positions:
+            for s in range(max(p - span + 1, 0), p + 1):
+                if s in starts:
+                    continue
+                present = sum(
+                    1 for ps in positions.values()
+                    if bisect_left(ps, s) < len(ps) and ps[bisect_left(ps, s)] < s + span
+                )
+                if present >= needed:
+                    starts.add(s)
+        return sorted(starts)
+
+    def scan(self, tokens, skip=None):
+        """Return (cliche_id, start, end, score) for phonetic hits in `tokens`.
+
+        `skip(start, end)` marks windows that are already accounted for. Only
+        the best-scoring window length is kept for each start.
+        """
+        hits_by_entry = {}
+        for pos, token in enumerate(tokens):
+            for entry in self.anchors.get(metaphone(token), ()):
+                hits_by_entry.setdefault(entry, {}).setdefault(metaphone(token), []).append(pos)
+
+        windows = {}  # (start, end) -> (phonetic code, letters)
+        hits = []
+        for entry, positions in hits_by_entry.items():
+            cliche_id, cliche_tokens, code, letters = self.codes[entry]
+            length = len(cliche_tokens)
+            sizes = range(max(length - 1, 1), length + self.tolerance + 1)
+            for start in self._candidate_starts(positions, self.needed[entry], sizes[-1]):
+                best = None
+                for size in sizes:
+                    end = start + size
+                    if end > len(tokens) or (skip is not None and skip(start, end)):
+                        continue
+                    if (start, end) not in windows:
+                        window_letters = run_together(tokens[start:end])
+                        windows[start, end] = (metaphone(window_letters), window_letters)
+                    window_code, window_letters = windows[start, end]
+                    score = fuzz.ratio(window_code, code, score_cutoff=self.threshold)
+                    if not score or not fuzz.ratio(window_letters, letters, score_cutoff=SPELLING_FLOOR):
+                        continue
+                    if not aligned(cliche_tokens, tokens[start:end]):
+                        continue
+                    if best is None or score > best[3]:
+                        best = (cliche_id, start, end, round(score))
+                if best:
+                    hits.append(best)
+        return hits
+
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+import shutil
+import time
+import numpy as np
+import pandas as pd
+import nltk
+
+from find_cliches import TRANSCRIPT_PATH, tokenize
+from aggregates import assign_manager
+
+# Paths
+TENURE_PATH = "data/raw/managers.csv"
+INDEX_DIR = "data/processed/phrase_index"
+META_FILE = "meta.json"  # Segment list
+VOCAB_FILE = "vocab.json"  # Term id -> token; ids never change once assigned
+DOCS_FILE = "docs.csv"  # One row per indexed transcript with its token span in the corpus
+
+# Layout: every transcript gets a span [start, start + length) of global token
+# positions, in indexing order. A segment holds the postings for one batch of
+# transcripts: for each term, its sorted global positions, delta-encoded
+# (the first gap is relative to the segment start, so uint32 always fits).
+# The document for a position is found from the spans, so a posting list
+# is just positions. Adding transcripts writes a new segment and never
+# rewrites old ones.
+SEGMENT_FILES = ("terms", "offsets", "gaps", "tokens")
+
+CONTEXT_TOKENS = 8
+DEFAULT_LIMIT = 20
+
+
+# --- Building ---
+def build_segment(token_ids):
+    """Postings for one segment's token stream, with positions relative to its first token."""
+    order = np.argsort(token_ids, kind="stable")  # By term, then by position
+    terms, counts = np.unique(token_ids, return_counts=True)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+    gaps = np.diff(order, prepend=0)
+    gaps[offsets[:-1]] = order[offsets[:-1]]  # First position of each term
+    return {
+        "terms": terms.astype(np.uint32),
+        "offsets": offsets,
+        "gaps": gaps.astype(np.uint32),
+        "tokens": token_ids.astype(np.uint32),
+    }
+
+
+def load_index(index_dir=INDEX_DIR):
+    """Return (meta, vocab, docs) or None if no index exists yet."""
+    if not os.path.exists(os.path.join(index_dir, META_FILE)):
+        return None
+    with open(os.path.join(index_dir, META_FILE)) as f:
+        meta = json.load(f)
+    with open(os.path.join(index_dir, VOCAB_FILE)) as f:
+        vocab = json.load(f)
+    docs = pd.read_csv(os.path.join(index_dir, DOCS_FILE))
+    return meta, vocab, docs
+
+
+def add_transcripts(df, tenure_df, index_dir=INDEX_DIR):
+    """Index transcripts not seen before as one new segment. Returns the number added."""
+    state = load_index(index_dir)
+    meta, vocab, docs = state if state else ({"segments": []}, [], pd.DataFrame())
+    if len(docs):
+        df = df[~df["video_url"].isin(docs["video_url"])]
+    if df.empty:
+        return 0
+
+    term_ids = {token: i for i, token in enumerate(vocab)}
+    start = int(docs["start"].iloc[-1] + docs["length"].iloc[-1]) if len(docs) else 0
+    streams, lengths = [], []
+    for text in df["transcript_text"]:
+        tokens = tokenize(text)
+        for token in tokens:
+            if token not in term_ids:
+                term_ids[token] = len(vocab)
+                vocab.append(token)
+        streams.append([term_ids[t] for t in tokens])
+        lengths.append(len(tokens))
+
+    new_docs = df[["video_url", "club", "publish_date"]].copy()
+    new_docs["publish_date"] = pd.to_datetime(new_docs["publish_date"])
+    new_docs["manager"] = new_docs.apply(assign_manager, axis=1, tenure_df=tenure_df)
+    new_docs["length"] = lengths
+    new_docs["start"] = start + np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    new_docs.insert(0, "doc_id", np.arange(len(docs), len(docs) + len(new_docs)))
+
+    name = f"seg_{len(meta['segments']):04d}"
+    os.makedirs(os.path.join(index_dir, name), exist_ok=True)
+    segment = build_segment(np.fromiter((t for s in streams for t in s), dtype=np.int64))
+    for key, array in segment.items():
+        np.save(os.path.join(index_dir, name, f"{key}.npy"), array)
+
+    # Written last so an interrupted build leaves the previous index usable
+    pd.concat([docs, new_docs], ignore_index=True).to_csv(os.path.join(index_dir, DOCS_FILE), index=False)
+    with open(os.path.join(index_dir, VOCAB_FILE), "w") as f:
+        json.dump(vocab, f)
+    meta["segments"].append({"name": name, "start": start, "tokens": int(sum(lengths))})
+    with open(os.path.join(index_dir, META_FILE), "w") as f:
+        json.dump(meta, f, indent=2)
+    return len(new_docs)
+
+
+# --- Querying ---
+class PhraseIndex:
+    """Read-only view of the index; segment arrays are memory-mapped."""
+
+    def __init__(self, index_dir=INDEX_DIR):
+        state = load_index(index_dir)
+        if state is None:
+            raise FileNotFoundError(f"No phrase index in {index_dir}; run `phrase_index.py build` first")
+        meta, vocab, self.docs = state
+        self.term_ids = {token: i for i, token in enumerate(vocab)}
+        self.vocab = vocab
+        self.doc_starts = self.docs["start"].to_numpy()
+        self.doc_ends = self.doc_starts + self.docs["length"].to_numpy()
+        self.segments = [
+            (seg["start"], {key: np.load(os.path.join(index_dir, seg["name"], f"{key}.npy"), mmap_mode="r")
+                            for key in SEGMENT_FILES})
+            for seg in meta["segments"]
+        ]
+
+    def positions(self, term_id):
+        """Sorted global positions of a term across every segment."""
+        parts = []
+        for start, seg in self.segments:
+            i = np.searchsorted(seg["terms"], term_id)
+            if i < len(seg["terms"]) and seg["terms"][i] == term_id:
+                gaps = np.asarray(seg["gaps"][seg["offsets"][i]:seg["offsets"][i + 1]], dtype=np.int64)
+                parts.append(start + np.cumsum(gaps))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def find(self, phrase, slop=0):
+        """Global (start, end) spans where the phrase's tokens occur in order.
+
+        `slop` is the total number of extra tokens allowed between them;
+        0 means an exact phrase. Spans never cross transcript boundaries.
+        """
+        tokens = tokenize(phrase)
+        if not tokens or any(t not in self.term_ids for t in tokens):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        starts = self.positions(self.term_ids[tokens[0]])
+        current, extra = starts.copy(), np.zeros(len(starts), dtype=np.int64)
+        for token in tokens[1:]:
+            following = self.positions(self.term_ids[token])
+            # Earliest later occurrence of the next token keeps the total gap smallest
+            idx = np.searchsorted(following, current, side="right")
+            found = idx < len(following)
+            starts, current, extra, idx = starts[found], current[found], extra[found], idx[found]
+            nxt = following[idx]
+            extra = extra + nxt - current - 1
+            current = nxt
+            keep = extra <= slop
+            starts, current, extra = starts[keep], current[keep], extra[keep]
+
+        ends = current + 1
+        same_doc = ends <= self.doc_ends[self.doc_ids(starts)]
+        return starts[same_doc], ends[same_doc]
+
+    def doc_ids(self, starts):
+        return np.searchsorted(self.doc_starts, starts, side="right") - 1
+
+    def tokens(self, start, end):
+        """Tokens at global positions [start, end)."""
+        out = []
+        for seg_start, seg in self.segments:
+            lo, hi = max(start, seg_start), min(end, seg_start + len(seg["tokens"]))
+            if lo < hi:
+                out.extend(self.vocab[t] for t in seg["tokens"][lo - seg_start:hi - seg_start])
+        return out
+
+    def counts(self, starts, by):
+        """Hits and hits per 10,000 words for each value of `by` (club or manager)."""
+        hits = self.docs.iloc[self.doc_ids(starts)].groupby(by).size().rename("hits")
+        words = self.docs.groupby(by)["length"].sum().rename("word_count")
+        table = pd.concat([hits, words], axis=1).fillna({"hits": 0})
+        table["hits_per_10000_words"] = table["hits"] / table["word_count"] * 10000
+        return table[table["hits"] > 0].sort_values("hits_per_10000_words", ascending=False)
+
+    def kwic(self, starts, ends, context=CONTEXT_TOKENS, limit=DEFAULT_LIMIT):
+        """Keyword-in-context lines for the first `limit` hits, clipped to their transcript."""
+        rows = []
+        for start, end, doc in zip(starts[:limit], ends[:limit], self.doc_ids(starts[:limit])):
+            left = " ".join(self.tokens(max(start - context, self.doc_starts[doc]), start))
+            right = " ".join(self.tokens(end, min(end + context, self.doc_ends[doc])))
+            rows.append({
+                "club": self.docs["club"].iat[doc],
+                "video_url": self.docs["video_url"].iat[doc],
+                "left": left,
+                "match": " ".join(self.tokens(start, end)),
+                "right": right,
+            })
+        return pd.DataFrame(rows, columns=["club", "video_url", "left", "match", "right"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Positional index for ad-hoc phrase search over the transcripts.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build_parser = commands.add_parser("build", help="Index transcripts not yet in the index")
+    build_parser.add_argument("--rebuild", action="store_true", help="Discard the existing index first")
+    query_parser = commands.add_parser("query", help="Count and show occurrences of a phrase")
+    query_parser.add_argument("phrase")
+    query_parser.add_argument("--slop", type=int, default=0, help="Extra tokens allowed between the phrase's words")
+    query_parser.add_argument("--by", choices=["club", "manager"], default="club")
+    query_parser.add_argument("--context", type=int, default=CONTEXT_TOKENS, help="Tokens of context either side")
+    query_parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT, help="Snippets to show")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        nltk.download("punkt")
+        if args.rebuild and os.path.exists(INDEX_DIR):
+            shutil.rmtree(INDEX_DIR)
+        tenure_df = pd.read_csv(TENURE_PATH, parse_dates=["start_date", "end_date"])
+        added = add_transcripts(pd.read_csv(TRANSCRIPT_PATH), tenure_df)
+        print(f"✅ Indexed {added} new transcripts in {INDEX_DIR}")
+        return
+
+    t0 = time.perf_counter()
+    index = PhraseIndex()
+    t1 = time.perf_counter()
+    starts, ends = index.find(args.phrase, args.slop)
+    counts = index.counts(starts, args.by)
+    snippets = index.kwic(starts, ends, args.context, args.limit)
+    t2 = time.perf_counter()
+
+    print(f"🔍 {len(starts)} hits for {args.phrase!r} (slop {args.slop}) in {(t2 - t1) * 1000:.1f} ms "
+          f"(index opened in {(t1 - t0) * 1000:.1f} ms)")
+    if len(starts):
+        print(counts.to_string())
+        print()
+        for row in snippets.itertuples():
+            print(f"{row.club:>15}  {row.left:>60} [{row.match}] {row.right}")
+
+
+if __name__ == "__main__":
+    main()
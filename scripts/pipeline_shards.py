@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import nltk
+
+from find_cliches import (
+    TRANSCRIPT_PATH, MATCH_DTYPE,
+    load_cliches, bucket_cliches, phonetic_index, match_cliches_in_transcript,
+    transcript_dimension, cliche_dimension, save_matches,
+)
+from aggregates import (
+    WEEKLY_KEYS, CLICHE_KEYS, TOTAL_COLUMNS,
+    transcript_rows, weekly_totals, cliche_totals, combine,
+)
+from weekly_ranks import compute_weekly_ranks
+from process_cliches import TENURE_PATH, OUTPUT_DIR, WEEK_FILE, WEEKLY_TOTALS_FILE, FAVOURITES_FILE, save_summaries
+
+# Paths
+SHARD_DIR = "data/shards"
+MANIFEST_FILE = "manifest.json"
+
+# Files in each shard directory
+SHARD_TRANSCRIPTS = "transcripts.csv"  # Input rows, with their transcript_id in the full corpus
+PARTIAL_MATCHES = "cliche_matches.npy"
+PARTIAL_STATUS = "partial.json"  # Written last, so its presence means the shard is complete
+
+# Manifest layout:
+#   {"source": ..., "cliches": [...], "shards": [{"shard": 0, "path": "shard_000", "transcripts": n}, ...]}
+# Transcripts go to shards by a hash of their video URL, so a transcript keeps
+# its shard when the corpus grows. Everything a node writes is keyed by the
+# global transcript_id, so merging is concatenation plus summing.
+
+
+def shard_of(video_url, n_shards):
+    return zlib.crc32(video_url.encode()) % n_shards
+
+
+def load_manifest(shard_dir=SHARD_DIR):
+    with open(os.path.join(shard_dir, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def shard(n_shards, source=TRANSCRIPT_PATH, shard_dir=SHARD_DIR):
+    """Split the transcripts into `n_shards` directories and write the manifest."""
+    df = pd.read_csv(source)
+    df.insert(0, "transcript_id", np.arange(len(df)))
+    assignment = df["video_url"].map(lambda url: shard_of(url, n_shards))
+
+    shards = []
+    for k in range(n_shards):
+        path = f"shard_{k:03d}"
+        os.makedirs(os.path.join(shard_dir, path), exist_ok=True)
+        status = os.path.join(shard_dir, path, PARTIAL_STATUS)
+        if os.path.exists(status):
+            os.remove(status)
+        part = df[assignment == k]
+        part.to_csv(os.path.join(shard_dir, path, SHARD_TRANSCRIPTS), index=False)
+        shards.append({"shard": k, "path": path, "transcripts": len(part)})
+
+    manifest = {"source": source, "cliches": load_cliches().names, "shards": shards}
+    with open(os.path.join(shard_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"📦 Split {len(df)} transcripts into {n_shards} shards under {shard_dir}")
+    return manifest
+
+
+def run_shard(k, shard_dir=SHARD_DIR, tenure_path=TENURE_PATH):
+    """Match one shard and write its mergeable partial summaries."""
+    manifest = load_manifest(shard_dir)
+    entry = manifest["shards"][k]
+    path = os.path.join(shard_dir, entry["path"])
+
+    catalogue = load_cliches()
+    if catalogue.names != manifest["cliches"]:
+        raise ValueError("Cliché catalogue differs from the one the manifest was built with; reshard first")
+    buckets = bucket_cliches(catalogue)
+    phonetic = phonetic_index(catalogue)
+
+    df = pd.read_csv(os.path.join(path, SHARD_TRANSCRIPTS))
+    tenure_df = pd.read_csv(tenure_path)
+    tenure_df["start_date"] = pd.to_datetime(tenure_df["start_date"])
+    tenure_df["end_date"] = pd.to_datetime(tenure_df["end_date"])
+
+    per_transcript = [
+        match_cliches_in_transcript(text, catalogue, buckets, transcript_id=t, phonetic=phonetic)
+        for t, text in zip(df["transcript_id"], df["transcript_text"])
+    ]
+    matches = np.concatenate(per_transcript) if per_transcript else np.empty(0, dtype=MATCH_DTYPE)
+    rows = transcript_rows(df, matches, tenure_df)
+
+    np.save(os.path.join(path, PARTIAL_MATCHES), matches)
+    rows.to_csv(os.path.join(path, WEEK_FILE), index=False)
+    weekly_totals(rows).to_csv(os.path.join(path, WEEKLY_TOTALS_FILE), index=False)
+    cliche_totals(rows, matches, cliche_dimension(catalogue)).to_csv(os.path.join(path, FAVOURITES_FILE), index=False)
+    with open(os.path.join(path, PARTIAL_STATUS), "w") as f:
+        json.dump({"shard": k, "transcripts": len(df), "matches": len(matches)}, f)
+    print(f"✅ Shard {k}: {len(matches)} matches in {len(df)} transcripts")
+
+
+def merge(shard_dir=SHARD_DIR, output_dir=OUTPUT_DIR):
+    """Combine every shard's partials into the outputs of find_cliches.py and process_cliches.py."""
+    manifest = load_manifest(shard_dir)
+    paths = [os.path.join(shard_dir, entry["path"]) for entry in manifest["shards"]]
+    missing = [entry["shard"] for entry, path in zip(manifest["shards"], paths)
+               if not os.path.exists(os.path.join(path, PARTIAL_STATUS))]
+    if missing:
+        raise FileNotFoundError(f"Shards not finished yet: {missing}")
+
+    # Match records and dimension tables, keyed by the global transcript_id
+    transcripts = pd.concat(
+        [pd.read_csv(os.path.join(path, SHARD_TRANSCRIPTS)) for path in paths]
+    ).sort_values("transcript_id")
+    matches = np.concatenate([np.load(os.path.join(path, PARTIAL_MATCHES)) for path in paths])
+    matches = matches[np.lexsort((matches["start"], matches["transcript_id"]))]
+    dim_cliches = pd.DataFrame({"cliche_id": np.arange(len(manifest["cliches"])), "cliche": manifest["cliches"]})
+    save_matches(matches, transcript_dimension(transcripts), dim_cliches, output_dir)
+
+    # Transcript-level rows in corpus order
+    rows = pd.concat(
+        [pd.read_csv(os.path.join(path, WEEK_FILE), parse_dates=["publish_date", "week"]) for path in paths]
+    ).sort_values("transcript_id")
+    rows["cliches_per_10000_words"] = rows["cliche_count"] / rows["word_count"] * 10000  # Exact, not the CSV round trip
+    rows.drop(columns="transcript_id").to_csv(os.path.join(output_dir, WEEK_FILE), index=False)
+
+    # Summaries are additive, so partials just sum
+    weekly = combine(
+        [pd.read_csv(os.path.join(path, WEEKLY_TOTALS_FILE), parse_dates=["week"]) for path in paths],
+        WEEKLY_KEYS, TOTAL_COLUMNS,
+    )
+    cliches = combine([pd.read_csv(os.path.join(path, FAVOURITES_FILE)) for path in paths], CLICHE_KEYS, ["count"])
+    ranks = compute_weekly_ranks(weekly)
+    save_summaries(weekly, cliches, ranks, output_dir)
+    print(f"✅ Merged {len(paths)} shards ({len(rows)} transcripts, {len(matches)} matches) into {output_dir}")
+
+
+def run_local(n_shards, workers):
+    """Shard, run every shard as a separate local process, then merge."""
+    shard(n_shards)
+    command = [sys.executable, os.path.abspath(__file__), "run", "--shard"]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda k: subprocess.run(command + [str(k)]), range(n_shards)))
+    failed = [k for k, result in enumerate(results) if result.returncode != 0]
+    if failed:
+        raise RuntimeError(f"Shards failed: {failed}")
+    merge()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run matching and aggregation as independent shards.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    shard_parser = commands.add_parser("shard", help="Split the transcripts and write the manifest")
+    shard_parser.add_argument("--shards", type=int, required=True)
+    run_parser = commands.add_parser("run", help="Match one shard and write its partial summaries")
+    run_parser.add_argument("--shard", type=int, required=True)
+    commands.add_parser("merge", help="Combine the partial summaries of every shard")
+    local_parser = commands.add_parser("local", help="Shard, run every shard as a local process, merge")
+    local_parser.add_argument("--shards", type=int, default=4)
+    local_parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    if args.command == "shard":
+        shard(args.shards)
+    elif args.command == "run":
+        nltk.download("punkt")
+        run_shard(args.shard)
+    elif args.command == "merge":
+        merge()
+    else:
+        run_local(args.shards, args.workers)
+
+
+if __name__ == "__main__":
+    main()
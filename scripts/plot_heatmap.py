@@ -21,7 +21,7 @@ WORD_COUNT_THRESHOLD = 50000
 # === File Paths ===
 cliche_counts_path = "data/processed/favourite_cliches.csv"
 cliches_per_10k_path = "data/processed/cliches_by_club.csv"
-transcripts_path = "data/raw/transcripts.csv"
+transcripts_path = "data/raw/transcripts_canonical.csv"
 output_path = "data/outputs/heatmap.png"
 
 os.makedirs(os.path.dirname(output_path), exist_ok=True)
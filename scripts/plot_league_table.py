@@ -20,19 +20,17 @@ plt.style.use('tableau-colorblind10')
 
 # Paths
 data_path = "data/processed/cliches_by_club.csv"  # or by_manager if preferred
+ci_path = "data/processed/cliches_by_club_ci.csv"  # written by bootstrap_ci.py
 badge_path = "data/raw/club_badges.csv"
-transcript_path = "data/raw/transcripts.csv"
 output_path = "data/outputs/league_table.png"
 
 # Load data
 df = pd.read_csv(data_path)
 badge_df = pd.read_csv(badge_path)
-transcript_df = pd.read_csv(transcript_path)
 
 # --- Filter by word count threshold ---
-# Compute total word count per club
-transcript_df["word_count"] = transcript_df["transcript_text"].str.split().str.len()
-word_counts = transcript_df.groupby("club")["word_count"].sum()
+# Total tokenised words per club, the same counts bootstrap_ci.py filters on
+word_counts = df.groupby("club")["word_count"].sum()
 
 # Set threshold
 MIN_WORDS = 50000
@@ -49,6 +47,12 @@ if "manager" in df.columns:
 df = df.sort_values("cliches_per_10000_words", ascending=False).reset_index(drop=True)
 df["rank"] = df.index + 1
 
+# Attach bootstrap confidence intervals if available
+has_ci = os.path.exists(ci_path)
+if has_ci:
+    ci_df = pd.read_csv(ci_path)[["club", "ci_low", "ci_high"]]
+    df = df.merge(ci_df, on="club", how="left")
+
 # Get color map values
 cmap = plt.get_cmap("plasma")
 colors = [cmap(i / len(df)) for i in range(len(df))]
@@ -60,8 +64,18 @@ bar_width = 0.6
 # Plot bars
 bars = ax.barh(df["rank"], df["cliches_per_10000_words"], height=bar_width, color=colors)
 
+# Plot confidence intervals and place badges beyond them
+badge_x = df["cliches_per_10000_words"]
+if has_ci:
+    xerr = [
+        (df["cliches_per_10000_words"] - df["ci_low"]).clip(lower=0),
+        (df["ci_high"] - df["cliches_per_10000_words"]).clip(lower=0),
+    ]
+    ax.errorbar(df["cliches_per_10000_words"], df["rank"], xerr=xerr, fmt="none", ecolor="black", capsize=3, linewidth=1)
+    badge_x = df[["cliches_per_10000_words", "ci_high"]].max(axis=1)
+
 # Add club badge next to each bar
-for i, (club, rank, value) in enumerate(zip(df["club"], df["rank"], df["cliches_per_10000_words"])):
+for i, (club, rank, value) in enumerate(zip(df["club"], df["rank"], badge_x)):
     badge_url = badge_df.loc[badge_df["club"] == club, "badge_url"].values
     if badge_url.size > 0:
         try:
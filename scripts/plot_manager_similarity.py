@@ -0,0 +1,68 @@
+import pandas as pd
+import numpy as np
+import seaborn as sns
+import matplotlib.pyplot as plt
+from scipy import sparse
+from scipy.cluster.hierarchy import linkage, leaves_list
+from scipy.spatial.distance import squareform
+import os
+
+from manager_similarity import OUTPUT_DIR, MATRIX_FILE, PROFILES_FILE
+
+# Matplotlib settings
+plt.rcParams.update({
+    'text.usetex': True,
+    'text.latex.preamble': r'\usepackage[cm]{sfmath}\usepackage{amsmath}',
+    'font.family': 'sans-serif',
+    'font.sans-serif': 'cm',
+    'font.size': 14,
+    'xtick.direction': 'in',
+    'ytick.direction': 'in'
+})
+plt.style.use('tableau-colorblind10')
+
+# === Parameters ===
+MAX_PROFILES = 40  # Most talkative profiles shown; the matrix itself covers everyone
+
+# === File Paths ===
+output_path = "data/outputs/manager_similarity.png"
+os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+# === Load data (written by manager_similarity.py) ===
+similarity = sparse.load_npz(os.path.join(OUTPUT_DIR, MATRIX_FILE))
+profiles = pd.read_csv(os.path.join(OUTPUT_DIR, PROFILES_FILE))
+
+# === Densify only the profiles being shown ===
+shown = profiles["word_count"].sort_values(ascending=False).index[:MAX_PROFILES].to_numpy()
+dense = similarity[shown][:, shown].toarray()
+np.fill_diagonal(dense, 1)
+
+# === Order by average-linkage clustering on cosine distance ===
+distance = squareform(1 - dense, checks=False).clip(min=0)
+order = leaves_list(linkage(distance, method="average")) if len(shown) > 2 else np.arange(len(shown))
+labels = profiles["profile"].to_numpy()[shown][order]
+pivot = pd.DataFrame(dense[np.ix_(order, order)], index=labels, columns=labels)
+
+# === Plot ===
+size = max(8, 0.3 * len(labels))
+plt.figure(figsize=(size + 2, size))
+ax = sns.heatmap(
+    pivot,
+    cmap="plasma_r",
+    mask=np.eye(len(labels), dtype=bool),
+    vmin=0,
+    vmax=1,
+    square=True,
+    linewidths=0.5,
+    cbar_kws={"label": "Cosine Similarity of Cliché Profiles (TF-IDF)"}
+)
+ax.set_xlabel("")
+ax.set_ylabel("")
+plt.xticks(rotation=45, ha="right")
+plt.tight_layout()
+
+# === Save ===
+plt.savefig(output_path)
+plt.close()
+
+print(f"✅ Manager similarity heatmap saved to {output_path}")
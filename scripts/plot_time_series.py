@@ -1,7 +1,9 @@
+import argparse
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
+from functools import lru_cache
 from matplotlib.offsetbox import OffsetImage, AnnotationBbox
 from matplotlib.patches import Circle
 from PIL import Image, ImageDraw
@@ -9,6 +11,8 @@ import requests
 from io import BytesIO
 import yaml
 
+from weekly_ranks import rank_weeks
+
 # Matplotlib settings
 plt.rcParams.update({
     'text.usetex': True,
@@ -24,65 +28,49 @@ plt.style.use('tableau-colorblind10')
 # Parameters
 WORD_COUNT_THRESHOLD = 50000  # Minimum total words required for a club to be included
 
+# Raster output is optional; the web dashboard (export_dashboard.py) uses the data instead
+parser = argparse.ArgumentParser(description="Plot cumulative cliché rank over the season for each club.")
+parser.add_argument("--format", choices=["webp", "png", "none"], default="webp", help="Raster format, or 'none' to skip")
+parser.add_argument("--dpi", type=int, default=150, help="Raster resolution")
+args = parser.parse_args()
+if args.format == "none":
+    print("⏩ Raster output disabled, nothing to do")
+    raise SystemExit(0)
+
 # Load data
-df = pd.read_csv("data/processed/cliches_by_week.csv", parse_dates=["publish_date", "week"])
+grid = pd.read_csv("data/processed/club_weekly_ranks.csv", parse_dates=["week"])  # Maintained by process_cliches.py
 tenure_df = pd.read_csv("data/raw/managers.csv", parse_dates=["start_date", "end_date"])
 badge_df = pd.read_csv("data/raw/club_badges.csv")
 manager_df = pd.read_csv("data/raw/managers.csv")
-transcripts_df = pd.read_csv("data/raw/transcripts.csv")
 
 with open("data/club_colours.yaml", "r") as f:
     club_colours = yaml.safe_load(f)
 
-# Calculate total word count per club
-transcripts_df["word_count"] = transcripts_df["transcript_text"].str.split().str.len()
-club_word_totals = transcripts_df.groupby("club")["word_count"].sum()
+# Total word count per club is the final cumulative count
+club_word_totals = grid.groupby("club")["cum_word_count"].max()
 
-# Filter out clubs below threshold
+# Filter out clubs below threshold and re-rank the remaining clubs each week
 valid_clubs = club_word_totals[club_word_totals >= WORD_COUNT_THRESHOLD].index.tolist()
-df = df[df["club"].isin(valid_clubs)]
-
-# Step 1: Weekly aggregation
-weekly_avg = (
-    df.groupby(["club", "week"])
-    .agg({"cliche_count": "sum", "word_count": "sum"})
-    .reset_index()
-)
-
-# Step 2: Full club-week grid
-all_clubs = df["club"].unique()
-all_weeks = df["week"].sort_values().unique()
-full_index = pd.MultiIndex.from_product([all_clubs, all_weeks], names=["club", "week"])
-weekly_avg = weekly_avg.set_index(["club", "week"]).reindex(full_index).reset_index()
-weekly_avg["cliche_count"] = weekly_avg["cliche_count"].fillna(0)
-weekly_avg["word_count"] = weekly_avg["word_count"].fillna(0)
-weekly_avg["cliches_per_10000_words"] = weekly_avg.apply(
-    lambda row: (row["cliche_count"] / row["word_count"]) * 10000 if row["word_count"] > 0 else 0, axis=1
-)
-
-# Step 3: Cumulative metrics + ranks
-weekly_avg = weekly_avg.sort_values(["club", "week"])
-weekly_avg["cum_cliche_count"] = weekly_avg.groupby("club")["cliche_count"].cumsum()
-weekly_avg["cum_word_count"] = weekly_avg.groupby("club")["word_count"].cumsum()
-weekly_avg["cum_cliches_per_10000_words"] = weekly_avg.apply(
-    lambda row: (row["cum_cliche_count"] / row["cum_word_count"]) * 10000 if row["cum_word_count"] > 0 else 0,
-    axis=1
-)
-weekly_avg = weekly_avg.sort_values(["week", "cum_cliches_per_10000_words", "club"], ascending=[True, False, True])
-weekly_avg["rank"] = weekly_avg.groupby("week").cumcount() + 1
+weekly_avg = rank_weeks(grid[grid["club"].isin(valid_clubs)])
+all_clubs = weekly_avg["club"].unique()
+all_weeks = weekly_avg["week"].sort_values().unique()
 
 # Output directory
 output_dir = "data/outputs/club_timeseries"
 os.makedirs(output_dir, exist_ok=True)
 sns.set_style("whitegrid")
 
+@lru_cache(maxsize=None)
+def load_image(source):
+    """Load a local or remote image once per run; every club's plot reuses the badges."""
+    if os.path.isfile(source):
+        return Image.open(source).convert("RGBA")
+    response = requests.get(source)
+    return Image.open(BytesIO(response.content)).convert("RGBA")
+
 def get_image_from_url(source, zoom=0.05, greyscale=False):
     try:
-        if os.path.isfile(source):
-            image = Image.open(source).convert("RGBA")
-        else:
-            response = requests.get(source)
-            image = Image.open(BytesIO(response.content)).convert("RGBA")
+        image = load_image(source).copy()
         if greyscale:
             image = image.convert("LA").convert("RGBA")
         return OffsetImage(image, zoom=zoom)
@@ -92,11 +80,7 @@ def get_image_from_url(source, zoom=0.05, greyscale=False):
 
 def get_circular_image_with_border(source, zoom=0.4, border_thickness=6, border_color="black"):
     try:
-        if os.path.isfile(source):
-            image = Image.open(source).convert("RGBA")
-        else:
-            response = requests.get(source)
-            image = Image.open(BytesIO(response.content)).convert("RGBA")
+        image = load_image(source).copy()
 
         standard_size = (128, 128)
         image = image.resize(standard_size, Image.Resampling.LANCZOS)
@@ -129,7 +113,7 @@ def get_circular_image_with_border(source, zoom=0.4, border_thickness=6, border_
 
 # Plotting
 for club in all_clubs:
-    fig, ax = plt.subplots(figsize=(14, 8), dpi=500)
+    fig, ax = plt.subplots(figsize=(14, 8), dpi=args.dpi)
 
     for other_club in all_clubs:
         group = weekly_avg[weekly_avg["club"] == other_club]
@@ -171,6 +155,6 @@ for club in all_clubs:
         spine.set_visible(False)
     fig.tight_layout()
 
-    filename = os.path.join(output_dir, f"{club.replace(' ', '_').lower()}.png")
-    plt.savefig(filename)
+    filename = os.path.join(output_dir, f"{club.replace(' ', '_').lower()}.{args.format}")
+    plt.savefig(filename, dpi=args.dpi)
     plt.close()
@@ -8,7 +8,7 @@ import os
 nltk.download('punkt')
 
 # === Load transcript data ===
-df = pd.read_csv("data/raw/transcripts.csv")
+df = pd.read_csv("data/raw/transcripts_canonical.csv")
 
 # === Tokenize transcript text and count words ===
 df["word_count"] = df["transcript_text"].apply(lambda t: len(nltk.word_tokenize(str(t))))
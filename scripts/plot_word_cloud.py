@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import os
 from wordcloud import WordCloud
@@ -20,9 +21,18 @@ plt.rcParams.update({
 })
 plt.style.use('tableau-colorblind10')
 
+# Raster output options
+parser = argparse.ArgumentParser(description="Plot a word cloud of cliché usage.")
+parser.add_argument("--format", choices=["webp", "png", "none"], default="webp", help="Raster format, or 'none' to skip")
+parser.add_argument("--dpi", type=int, default=150, help="Raster resolution")
+args = parser.parse_args()
+if args.format == "none":
+    print("⏩ Raster output disabled, nothing to do")
+    raise SystemExit(0)
+
 # Paths
 input_path = "data/processed/favourite_cliches.csv"
-output_path = "data/outputs/wordcloud.png"
+output_path = f"data/outputs/wordcloud.{args.format}"
 os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
 # Load data
@@ -67,7 +77,7 @@ cb.set_label("Cliché Count")
 cb.ax.tick_params(labelsize=10)
 
 plt.tight_layout()
-plt.savefig(output_path, dpi=500)
+plt.savefig(output_path, dpi=args.dpi)
 plt.close()
 
 print(f"✅ Word cloud with full-height color bar saved to {output_path}")
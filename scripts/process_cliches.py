@@ -1,89 +1,171 @@
+import argparse
 import os
+import numpy as np
 import pandas as pd
 import nltk
-from datetime import datetime
 
-# Ensure required NLTK resources are downloaded
-nltk.download("punkt")
+from find_cliches import load_matches
+from aggregates import (
+    WEEKLY_KEYS, CLICHE_KEYS, TOTAL_COLUMNS,
+    transcript_rows, weekly_totals, cliche_totals, combine, favourite_cliches, rate_summary,
+)
+from weekly_ranks import update_weekly_ranks
 
 # Paths
-MATCH_PATH = "data/processed/cliche_matches.csv"
-TRANSCRIPT_PATH = "data/raw/transcripts.csv"
+MATCH_DIR = "data/processed"  # cliche_matches.npy + dimension tables from find_cliches.py
+TRANSCRIPT_PATH = "data/raw/transcripts_canonical.csv"
 TENURE_PATH = "data/raw/managers.csv"
 OUTPUT_DIR = "data/processed"
 
-# Load data
-match_df = pd.read_csv(MATCH_PATH)
-full_df = pd.read_csv(TRANSCRIPT_PATH)
-tenure_df = pd.read_csv(TENURE_PATH)
-
-# Convert date columns
-full_df["publish_date"] = pd.to_datetime(full_df["publish_date"])
-tenure_df["start_date"] = pd.to_datetime(tenure_df["start_date"])
-tenure_df["end_date"] = pd.to_datetime(tenure_df["end_date"])
-
-# Count words per transcript
-full_df["word_count"] = full_df["transcript_text"].apply(lambda t: len(nltk.word_tokenize(t)))
-
-# Count total cliche matches per transcript
-cliche_counts = match_df.groupby("video_url").size().reset_index(name="cliche_count")
-full_df = full_df.merge(cliche_counts, on="video_url", how="left")
-full_df["cliche_count"] = full_df["cliche_count"].fillna(0)
-
-# Assign manager at publish date
-def assign_manager(row):
-    tenures = tenure_df[tenure_df["club"] == row["club"]]
-    for _, t in tenures.iterrows():
-        if t["start_date"] <= row["publish_date"] and (
-            pd.isna(t["end_date"]) or row["publish_date"] <= t["end_date"]
-        ):
-            return t["manager"]
-    return "Unknown"
-
-
-full_df["manager"] = full_df.apply(assign_manager, axis=1)
-
-# Add week column and normalize cliche rate
-full_df["week"] = full_df["publish_date"].dt.to_period("W").dt.start_time
-full_df["cliches_per_10000_words"] = (full_df["cliche_count"] / full_df["word_count"]) * 10000
-
-# Save weekly transcript-level data
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-full_df.to_csv(os.path.join(OUTPUT_DIR, "cliches_by_week.csv"), index=False)
-
-# Cliche usage by club/manager breakdown
-match_df = match_df.merge(full_df[["video_url", "club", "manager"]], on="video_url", how="left")
-if "club" not in match_df.columns:
-    match_df["club"] = match_df["club_y"] if "club_y" in match_df.columns else match_df["club_x"]
-
-breakdown = (
-    match_df.groupby(["club", "manager", "cliche"])
-    .size()
-    .reset_index(name="count")
-    .sort_values(["club", "manager", "count"], ascending=[True, True, False])
-)
-breakdown.to_csv(os.path.join(OUTPUT_DIR, "favourite_cliches.csv"), index=False)
-
-
-# Manager-level summary
-manager_grouped = full_df.groupby(["club", "manager"]).agg({
-    "cliche_count": "sum",
-    "word_count": "sum"
-}).reset_index()
-manager_grouped["cliches_per_10000_words"] = (
-    manager_grouped["cliche_count"] / manager_grouped["word_count"] * 10000
-)
-manager_grouped.to_csv(os.path.join(OUTPUT_DIR, "cliches_by_manager.csv"), index=False)
-
-# Club-level summary
-club_grouped = full_df.groupby("club").agg({
-    "cliche_count": "sum",
-    "word_count": "sum"
-}).reset_index()
-club_grouped["cliches_per_10000_words"] = (
-    club_grouped["cliche_count"] / club_grouped["word_count"] * 10000
-)
-club_grouped.to_csv(os.path.join(OUTPUT_DIR, "cliches_by_club.csv"), index=False)
-
-# Confirm outputs
-os.listdir(OUTPUT_DIR)
+# Outputs; the last three double as the running state for --incremental
+WEEK_FILE = "cliches_by_week.csv"  # One row per processed transcript
+FAVOURITES_FILE = "favourite_cliches.csv"
+MANAGER_FILE = "cliches_by_manager.csv"
+CLUB_FILE = "cliches_by_club.csv"
+WEEKLY_TOTALS_FILE = "weekly_totals.csv"  # Totals per club, manager and week
+RANKS_FILE = "club_weekly_ranks.csv"  # Club-week grid with cumulative totals and ranks
+
+
+def load_state(output_dir):
+    """Processed video URLs, weekly totals, cliché totals and the rank grid from a previous run."""
+    path = lambda name: os.path.join(output_dir, name)
+    required = [WEEK_FILE, WEEKLY_TOTALS_FILE, FAVOURITES_FILE, RANKS_FILE]
+    if not all(os.path.exists(path(name)) for name in required):
+        return None
+    processed = set(pd.read_csv(path(WEEK_FILE), usecols=["video_url"])["video_url"])
+    weekly = pd.read_csv(path(WEEKLY_TOTALS_FILE), parse_dates=["week"])
+    cliches = pd.read_csv(path(FAVOURITES_FILE))
+    ranks = pd.read_csv(path(RANKS_FILE), parse_dates=["week"])
+    return processed, weekly, cliches, ranks
+
+
+def stored_rows(output_dir, exclude):
+    """Rows of cliches_by_week.csv not in `exclude`, as written (strings), and the rest."""
+    path = os.path.join(output_dir, WEEK_FILE)
+    stored = pd.read_csv(path, dtype=str, keep_default_na=False)
+    gone = stored["video_url"].isin(exclude)
+    return stored[~gone], stored[gone]
+
+
+def as_totals(rows):
+    """Parse the columns the totals need from rows read back by `stored_rows`."""
+    rows = rows.assign(week=pd.to_datetime(rows["week"]))
+    return rows.astype({column: float for column in TOTAL_COLUMNS})
+
+
+def is_stale(kept, cliches, matches, ids, dim_cliches):
+    """Whether stored totals disagree with the current matches, e.g. after cliches.yaml changed.
+
+    Each stored transcript's cliche_count is compared with a bincount of its
+    current matches, so no transcript is tokenised again.
+    """
+    transcript_ids = kept["video_url"].map(ids).astype(int).to_numpy()
+    counts = np.bincount(matches["transcript_id"], minlength=len(ids))
+    if (counts[transcript_ids] != kept["cliche_count"].astype(float).to_numpy()).any():
+        return True
+    return not set(cliches["cliche"]) <= set(dim_cliches["cliche"])
+
+
+def save_summaries(weekly, cliches, ranks, output_dir=OUTPUT_DIR):
+    """Write every output derived from the running totals."""
+    weekly.to_csv(os.path.join(output_dir, WEEKLY_TOTALS_FILE), index=False)
+    ranks.to_csv(os.path.join(output_dir, RANKS_FILE), index=False)
+
+    # Cliche usage by club/manager breakdown
+    favourite_cliches(cliches).to_csv(os.path.join(output_dir, FAVOURITES_FILE), index=False)
+
+    # Manager- and club-level summaries
+    rate_summary(weekly, ["club", "manager"]).to_csv(os.path.join(output_dir, MANAGER_FILE), index=False)
+    rate_summary(weekly, ["club"]).to_csv(os.path.join(output_dir, CLUB_FILE), index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate cliché matches per week, manager and club.")
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="Only process transcripts not yet in cliches_by_week.csv and add them to the stored totals; "
+             "transcripts since dropped from the canonical set are taken out again"
+    )
+    args = parser.parse_args()
+
+    # Ensure required NLTK resources are downloaded
+    nltk.download("punkt")
+
+    # Load data
+    matches, dim_transcripts, dim_cliches = load_matches(MATCH_DIR)
+    full_df = pd.read_csv(TRANSCRIPT_PATH)
+    tenure_df = pd.read_csv(TENURE_PATH)
+    tenure_df["start_date"] = pd.to_datetime(tenure_df["start_date"])
+    tenure_df["end_date"] = pd.to_datetime(tenure_df["end_date"])
+
+    # Link transcripts to their match records
+    ids = dim_transcripts.set_index("video_url")["transcript_id"]
+    full_df["transcript_id"] = full_df["video_url"].map(ids)
+    if full_df["transcript_id"].isna().any():
+        raise ValueError("Matches are stale; rerun find_cliches.py")
+    full_df["transcript_id"] = full_df["transcript_id"].astype(int)
+
+    state = load_state(OUTPUT_DIR) if args.incremental else None
+    if args.incremental and state is None:
+        print("⚠️ No stored state found, processing everything")
+    elif state is not None:
+        # Transcripts aggregated before but since dropped from the canonical set
+        removed = state[0] - set(full_df["video_url"])
+        kept, gone = stored_rows(OUTPUT_DIR, removed)
+        if is_stale(kept, state[2], matches, ids, dim_cliches):
+            print("⚠️ Stored totals don't match the current matches, processing everything")
+            state = None
+    if state is None:
+        processed, weekly_state, cliche_state, rank_state = set(), None, None, None
+        removed = set()
+    else:
+        processed, weekly_state, cliche_state, rank_state = state
+
+    # Only the new transcripts are tokenised and counted
+    new_df = full_df[~full_df["video_url"].isin(processed)]
+    rows = transcript_rows(new_df, matches, tenure_df)
+    print(f"🔍 Processing {len(rows)} new transcripts ({len(processed)} already aggregated)")
+
+    if removed:
+        print(f"⚠️ Removing {len(removed)} transcripts no longer in {TRANSCRIPT_PATH}")
+        kept_totals, gone_totals = as_totals(kept), as_totals(gone)
+        weekly_removed = weekly_totals(gone_totals)
+        weekly_removed[TOTAL_COLUMNS] = -weekly_removed[TOTAL_COLUMNS]
+
+        # Their matches are gone with them, so recount clichés from the rows that remain (no tokenising)
+        kept_totals["transcript_id"] = kept_totals["video_url"].map(ids).astype(int)
+        cliche_state = cliche_totals(kept_totals, matches, dim_cliches)
+    else:
+        kept_totals, weekly_removed = None, None
+
+    # Apply deltas to the running totals
+    weekly_delta = weekly_totals(rows)
+    weekly = combine([weekly_state, weekly_delta, weekly_removed], WEEKLY_KEYS, TOTAL_COLUMNS)
+    cliches = combine([cliche_state, cliche_totals(rows, matches, dim_cliches)], CLICHE_KEYS, ["count"])
+    rank_delta = combine([weekly_delta, weekly_removed], ["club", "week"], TOTAL_COLUMNS)
+    if removed:
+        # Drop groups left without transcripts; if a club or week vanished, the grid must be rebuilt
+        live = pd.concat([kept_totals[WEEKLY_KEYS], rows[WEEKLY_KEYS]]).drop_duplicates()
+        weekly = weekly.merge(live, on=WEEKLY_KEYS)
+        if set(rank_state["club"]) != set(live["club"]) or set(rank_state["week"]) != set(live["week"]):
+            rank_state, rank_delta = None, weekly
+    ranks = update_weekly_ranks(rank_state, rank_delta)
+
+    # Save weekly transcript-level data (appended in incremental mode)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    week_path = os.path.join(OUTPUT_DIR, WEEK_FILE)
+    rows = rows.drop(columns="transcript_id")
+    if state is not None:
+        header = pd.read_csv(week_path, nrows=0).columns
+        if removed:
+            kept.to_csv(week_path, index=False)
+        rows[header].to_csv(week_path, mode="a", header=False, index=False)
+    else:
+        rows.to_csv(week_path, index=False)
+
+    save_summaries(weekly, cliches, ranks)
+    print(f"✅ Aggregates saved to {OUTPUT_DIR}")
+
+
+if __name__ == "__main__":
+    main()
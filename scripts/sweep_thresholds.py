@@ -0,0 +1,143 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+import nltk
+
+from find_cliches import (
+    TRANSCRIPT_PATH, MATCH_DTYPE, FUZZY, FUZZY_THRESHOLD, PROXIMITY, WINDOW_TOLERANCE,
+    tokenize, load_cliches, bucket_cliches, phonetic_index, score_candidates, deduplicate,
+)
+from phonetic_index import PHONETIC_THRESHOLD, GROUP_THRESHOLD
+
+# Paths
+WEEKLY_PATH = "data/processed/cliches_by_week.csv"  # Word counts per transcript
+SWEEP_DIR = "data/processed/sweep"
+CACHE_FILE = "score_cache.npy"  # Every candidate scoring at least the floor, before dedup
+CACHE_META_FILE = "score_cache.json"
+
+# Parameters
+MIN_WORDS = 50000  # Same threshold as the league table
+DEFAULT_THRESHOLDS = [85, 90, 95]
+DEFAULT_PROXIMITIES = [5, 10, 20]
+DEFAULT_TOLERANCES = [0, 1, 2]
+
+
+def build_cache(df, catalogue, floor, max_tolerance):
+    """Score every transcript once at the loosest settings of the grid."""
+    buckets = bucket_cliches(catalogue)
+    phonetic = phonetic_index(catalogue)
+    per_transcript = [
+        score_candidates(
+            tokenize(text), catalogue, buckets, transcript_id=i, threshold=floor, tolerance=max_tolerance,
+            phonetic=phonetic,
+        )
+        for i, text in enumerate(df["transcript_text"])
+    ]
+    return np.concatenate(per_transcript) if per_transcript else np.empty(0, dtype=MATCH_DTYPE)
+
+
+def load_or_build_cache(df, catalogue, floor, max_tolerance, rescore=False):
+    """Reuse the stored score cache if it covers the requested floor and tolerance."""
+    cache_path = os.path.join(SWEEP_DIR, CACHE_FILE)
+    meta_path = os.path.join(SWEEP_DIR, CACHE_META_FILE)
+    meta = {
+        "cliches": catalogue.names,
+        "video_urls": df["video_url"].tolist(),
+        "phonetic_threshold": PHONETIC_THRESHOLD,
+        "phonetic_group_threshold": GROUP_THRESHOLD,
+        "fuzzy_scores": "floor",  # Caches from before scores were floored can pass a threshold they missed
+    }
+    if not rescore and os.path.exists(cache_path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            stored = json.load(f)
+        if (
+            all(stored.get(k) == v for k, v in meta.items())
+            and stored["floor"] <= floor and stored["max_tolerance"] >= max_tolerance
+        ):
+            print(f"♻️ Reusing score cache (floor {stored['floor']}, tolerance {stored['max_tolerance']})")
+            return np.load(cache_path)
+
+    print(f"🔍 Scoring all windows once (floor {floor}, tolerance up to {max_tolerance})...")
+    cache = build_cache(df, catalogue, floor, max_tolerance)
+    os.makedirs(SWEEP_DIR, exist_ok=True)
+    np.save(cache_path, cache)
+    with open(meta_path, "w") as f:
+        json.dump({**meta, "floor": floor, "max_tolerance": max_tolerance}, f)
+    return cache
+
+
+def select(cache, fuzzy_lengths, threshold, tolerance):
+    """Candidates kept at one grid setting; `threshold` and `tolerance` only apply to fuzzy hits."""
+    extra = (cache["end"] - cache["start"]).astype(np.int64) - fuzzy_lengths[cache["cliche_id"]]
+    keep = (cache["method"] != FUZZY) | ((cache["score"] >= threshold) & (extra <= tolerance))
+    return cache[keep]
+
+
+def league_table(matches, transcripts, min_words=MIN_WORDS):
+    """Clubs with at least `min_words` words ranked by clichés per 10,000 words for one set of matches."""
+    counts = np.bincount(matches["transcript_id"], minlength=len(transcripts))
+    table = (
+        transcripts.assign(cliche_count=counts)
+        .groupby("club")[["cliche_count", "word_count"]].sum()
+        .reset_index()
+    )
+    table = table[table["word_count"] >= min_words].copy()
+    table["cliches_per_10000_words"] = table["cliche_count"] / table["word_count"] * 10000
+    table = table.sort_values("cliches_per_10000_words", ascending=False).reset_index(drop=True)
+    table["rank"] = table.index + 1
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="League tables for a grid of matching settings from one scoring pass.")
+    parser.add_argument("--thresholds", type=int, nargs="+", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--proximities", type=int, nargs="+", default=DEFAULT_PROXIMITIES)
+    parser.add_argument("--tolerances", type=int, nargs="+", default=DEFAULT_TOLERANCES)
+    parser.add_argument("--min-words", type=int, default=MIN_WORDS, help="Leave out clubs with fewer words")
+    parser.add_argument("--rescore", action="store_true", help="Ignore any stored score cache")
+    args = parser.parse_args()
+
+    nltk.download("punkt")
+
+    catalogue = load_cliches()
+    df = pd.read_csv(TRANSCRIPT_PATH)
+    cache = load_or_build_cache(df, catalogue, min(args.thresholds), max(args.tolerances), args.rescore)
+    fuzzy_lengths = np.array([len(form.split()) for form in catalogue.fuzzy_forms])
+
+    # Word counts per transcript, aligned to transcript_id (row position)
+    words = pd.read_csv(WEEKLY_PATH, usecols=["video_url", "word_count"]).drop_duplicates("video_url")
+    transcripts = df[["video_url", "club"]].merge(words, on="video_url", how="left").fillna({"word_count": 0})
+
+    tables = []
+    for threshold in sorted(args.thresholds):
+        for tolerance in sorted(args.tolerances):
+            candidates = select(cache, fuzzy_lengths, threshold, tolerance)
+            for proximity in sorted(args.proximities):
+                matches = deduplicate(candidates, proximity)
+                np.save(os.path.join(SWEEP_DIR, f"matches_t{threshold}_w{tolerance}_p{proximity}.npy"), matches)
+                tables.append(league_table(matches, transcripts, args.min_words).assign(
+                    threshold=threshold, tolerance=tolerance, proximity=proximity
+                ))
+
+    # --- Save sensitivity report ---
+    tables = pd.concat(tables, ignore_index=True)
+    tables = tables[["threshold", "tolerance", "proximity", "rank", "club", "cliche_count", "word_count", "cliches_per_10000_words"]]
+    tables.to_csv(os.path.join(SWEEP_DIR, "league_tables.csv"), index=False)
+
+    default = tables[
+        (tables["threshold"] == FUZZY_THRESHOLD) & (tables["tolerance"] == WINDOW_TOLERANCE) & (tables["proximity"] == PROXIMITY)
+    ].set_index("club")["rank"]
+    summary = tables.groupby("club")["rank"].agg(["min", "max", "mean"]).rename(columns=lambda c: f"{c}_rank")
+    summary["default_rank"] = default
+    summary["rank_spread"] = summary["max_rank"] - summary["min_rank"]
+    summary = summary.sort_values(["default_rank", "mean_rank"]).reset_index()
+    summary.to_csv(os.path.join(SWEEP_DIR, "sensitivity_summary.csv"), index=False)
+
+    n_settings = len(args.thresholds) * len(args.tolerances) * len(args.proximities)
+    print(f"✅ {n_settings} settings from one scoring pass; report saved to {SWEEP_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import pandas as pd
+
+
+def compute_weekly_ranks(df):
+    """Build the full club-week grid with cumulative clichés per 10,000 words and ranks.
+
+    `df` is transcript-level data with club, week, cliche_count and word_count
+    columns (as in cliches_by_week.csv). Weeks with no transcripts for a club
+    carry that club's cumulative figures forward.
+    """
+    # Step 1: Weekly aggregation
+    weekly_avg = (
+        df.groupby(["club", "week"])
+        .agg({"cliche_count": "sum", "word_count": "sum"})
+        .reset_index()
+    )
+
+    # Step 2: Full club-week grid
+    all_clubs = df["club"].unique()
+    all_weeks = df["week"].sort_values().unique()
+    full_index = pd.MultiIndex.from_product([all_clubs, all_weeks], names=["club", "week"])
+    weekly_avg = weekly_avg.set_index(["club", "week"]).reindex(full_index).reset_index()
+    weekly_avg["cliche_count"] = weekly_avg["cliche_count"].fillna(0)
+    weekly_avg["word_count"] = weekly_avg["word_count"].fillna(0)
+    weekly_avg["cliches_per_10000_words"] = per_10000(weekly_avg["cliche_count"], weekly_avg["word_count"])
+
+    # Step 3: Cumulative metrics + ranks
+    weekly_avg = weekly_avg.sort_values(["club", "week"])
+    weekly_avg["cum_cliche_count"] = weekly_avg.groupby("club")["cliche_count"].cumsum()
+    weekly_avg["cum_word_count"] = weekly_avg.groupby("club")["word_count"].cumsum()
+    weekly_avg["cum_cliches_per_10000_words"] = per_10000(weekly_avg["cum_cliche_count"], weekly_avg["cum_word_count"])
+
+    return rank_weeks(weekly_avg)
+
+
+def rank_weeks(grid):
+    """Rank clubs within each week by cumulative clichés per 10,000 words (1 = most)."""
+    grid = grid.sort_values(["week", "cum_cliches_per_10000_words", "club"], ascending=[True, False, True])
+    grid["rank"] = grid.groupby("week").cumcount() + 1
+    return grid
+
+
+def update_weekly_ranks(grid, delta):
+    """Apply new club-week totals to a grid from `compute_weekly_ranks`.
+
+    `delta` holds club, week, cliche_count and word_count for new transcripts
+    only. Weeks before the earliest week in `delta` are kept as stored; later
+    weeks are rebuilt from each club's last stored cumulative totals, so a
+    normal weekly refresh only touches the newest week.
+    """
+    if delta.empty:
+        return grid
+    if grid is None or grid.empty:
+        return compute_weekly_ranks(delta)
+
+    delta = delta.groupby(["club", "week"])[["cliche_count", "word_count"]].sum()
+    clubs = grid["club"].unique()
+    if not set(delta.index.get_level_values("club")) <= set(clubs):
+        # A new club changes every earlier week's ranking; rebuild from the totals
+        combined = pd.concat([grid[["club", "week", "cliche_count", "word_count"]], delta.reset_index()])
+        return compute_weekly_ranks(combined)
+
+    first_week = delta.index.get_level_values("week").min()
+    head = grid[grid["week"] < first_week]
+    tail = grid[grid["week"] >= first_week].set_index(["club", "week"])[["cliche_count", "word_count"]]
+
+    weeks = sorted(set(tail.index.get_level_values("week")) | set(delta.index.get_level_values("week")))
+    full_index = pd.MultiIndex.from_product([clubs, weeks], names=["club", "week"])
+    tail = tail.reindex(full_index, fill_value=0).add(delta.reindex(full_index, fill_value=0)).reset_index()
+    tail["cliches_per_10000_words"] = per_10000(tail["cliche_count"], tail["word_count"])
+
+    # Continue each club's running totals from the last stored week
+    tail = tail.sort_values(["club", "week"])
+    last = head.sort_values("week").groupby("club")[["cum_cliche_count", "cum_word_count"]].last()
+    last = last.reindex(tail["club"]).fillna(0).to_numpy()
+    tail["cum_cliche_count"] = last[:, 0] + tail.groupby("club")["cliche_count"].cumsum().to_numpy()
+    tail["cum_word_count"] = last[:, 1] + tail.groupby("club")["word_count"].cumsum().to_numpy()
+    tail["cum_cliches_per_10000_words"] = per_10000(tail["cum_cliche_count"], tail["cum_word_count"])
+
+    return pd.concat([head, rank_weeks(tail)], ignore_index=True)
+
+
+def per_10000(cliches, words):
+    """Clichés per 10,000 words, 0 where there are no words."""
+    return (cliches / words.where(words > 0) * 10000).fillna(0)
@@ -0,0 +1,43 @@
+import os
+import sys
+
+import nltk
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, "scripts"))
+
+from find_cliches import tokenize  # noqa: E402
+from phonetic_index import PhoneticIndex  # noqa: E402
+
+nltk.download("punkt", quiet=True)
+
+# Caption misrecognitions that only match by sound
+MISRECOGNITIONS = [
+    ("parking the bus", "we were packing the bus late on"),
+    ("by the scruff of the neck", "we took them by the scruff of then eck"),
+]
+
+# Different words that sound close to a cliché's; none of these may match
+NEAR_MISSES = [
+    ("at the end of the day", "at the end of the game we were fine"),
+    ("at the end of the day", "at the end of the week we travel"),
+    ("at the end of the day", "at the end of the month"),
+    ("at the end of the day", "at the end of the match we"),
+    ("at the end of the day", "at the end of the half we"),
+    ("that kind of player", "he is the kind of player you want"),
+    ("have to take our chances", "we have to take the chances we get"),
+]
+
+
+def scan(cliche, text):
+    return PhoneticIndex([" ".join(tokenize(cliche))]).scan(tokenize(text))
+
+
+@pytest.mark.parametrize("cliche, text", MISRECOGNITIONS)
+def test_finds_misrecognitions(cliche, text):
+    assert scan(cliche, text)
+
+
+@pytest.mark.parametrize("cliche, text", NEAR_MISSES)
+def test_rejects_near_misses(cliche, text):
+    assert not scan(cliche, text)